@@ -0,0 +1,126 @@
+import os
+import sys
+import signal
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from custom_scheduler import CustomScheduler, scheduler_options_from_env
+
+
+class AsyncCustomScheduler(CustomScheduler):
+    """Asyncio scheduling engine
+
+    Placement decisions are still made one at a time on the event loop against the in-memory
+    index, so the per-node constraints hold without locks. The node is reserved in the
+    index as soon as it is chosen, and the bind (plus any preemption evictions) is issued in the
+    background with at most max_in_flight API calls outstanding. Throughput is then bounded by
+    decision speed rather than by apiserver round-trips.
+
+    API calls go through the regular synchronous client on a thread pool sized to the in-flight
+    limit, so no second Kubernetes client library is needed.
+    """
+
+    def __init__(self, scheduler_name: str = "custom-scheduler", max_in_flight: int = 32, **kwargs):
+        self.max_in_flight = max_in_flight  # read by the base class when it sizes the connection pools
+        super().__init__(scheduler_name, **kwargs)
+        
+        self._loop = None
+        self._executor = None
+        self._in_flight = None
+        self._tasks = set()
+    
+    def _api_calls_in_flight(self) -> int:
+        return self.max_in_flight
+    
+    def _spawn(self, coro):
+        """Run a coroutine in the background, keeping a reference until it finishes"""
+        task = self._loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+    
+    async def _call_api(self, func, *args):
+        """Run a blocking client call on the executor, bounded by the in-flight limit"""
+        async with self._in_flight:
+            return await self._loop.run_in_executor(self._executor, func, *args)
+    
+    def _submit_bind(self, pod, node_name: str):
+        """Issue the bind as a background task instead of on the bind executor"""
+        self._spawn(self._bind_async(pod, node_name))
+    
+    def _submit_eviction(self, pod, node_name: str, uid: str, entry: tuple):
+        """Evict the victim as a background task"""
+        self._spawn(self._evict_async(pod, node_name, uid, entry))
+    
+    def _submit_nomination(self, pod, node_name):
+        """Issue the nominated node patch as a background task"""
+        self._spawn(self._call_api(self._patch_nominated_node, pod, node_name))
+    
+    def _submit_hand_off(self, pod, shard: int, hops: int):
+        """Issue the hand-off patch as a background task"""
+        self._spawn(self._hand_off_async(pod, shard, hops))
+    
+    async def _hand_off_async(self, pod, shard: int, hops: int):
+        self._on_hand_off_result(pod, await self._call_api(self._patch_pod_shard, pod, shard, hops))
+    
+    async def _bind_async(self, pod, node_name: str):
+        success = await self._call_api(self._bind_pod_to_node, pod.metadata.name, pod.metadata.namespace, node_name)
+        self._on_bind_result(pod, node_name, success)
+    
+    async def _evict_async(self, pod, node_name: str, uid: str, entry: tuple):
+        """Evict one victim, sleeping on the loop rather than in an API slot while a budget blocks it"""
+        _, namespace, victim_name, _ = entry
+        started = time.monotonic()
+        retries = 0
+        while True:
+            result = await self._call_api(self.evictor.attempt, victim_name, namespace)
+            delay = self.evictor.retry_delay(result, started, retries)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+            retries += 1
+        self._on_eviction_result(pod, node_name, uid, entry, self.evictor.finish(victim_name, namespace, result, started, retries))
+    
+    async def _run_async(self):
+        self._loop = asyncio.get_running_loop()
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="scheduler-api")
+        
+        self.logger.info("Starting async scheduler: %s (max %d API calls in flight)", self.scheduler_name, self.max_in_flight)
+        self.logger.info("%d available nodes", len(self.free_nodes))
+        
+        events = asyncio.Queue()
+        self._put = lambda item: self._loop.call_soon_threadsafe(events.put_nowait, item)
+        self._start_metrics_server()
+        
+        self._queue_cached_pending_pods()
+        self._start_watches(self._put)
+        self._start_leader_election()
+        
+        timeout = 0
+        try:
+            while True:
+                if timeout is None or timeout > 0:
+                    try:
+                        self._dispatch(*await asyncio.wait_for(events.get(), timeout=timeout))
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    # Let bind tasks make progress between back-to-back decisions
+                    await asyncio.sleep(0)
+                while not events.empty():
+                    self._dispatch(*events.get_nowait())
+                timeout = self._run_scheduling_cycle() if self._leading else None
+        finally:
+            self._stop_leader_election()
+    
+    def run(self):
+        """Main scheduler loop on an asyncio event loop"""
+        asyncio.run(self._run_async())
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    scheduler = AsyncCustomScheduler(max_in_flight=int(os.environ.get("SCHEDULER_MAX_IN_FLIGHT", "32")),
+                                     **scheduler_options_from_env())
+    scheduler.run()
@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Fake Kubernetes API server for running the custom scheduler without a cluster
+
+Serves the subset of the core/v1 API the scheduler uses (list/watch/create/patch/delete pods,
+list/watch nodes, bindings, policy/v1 evictions, and get/create/update of coordination.k8s.io/v1
+Leases for leader election) over plain HTTP on localhost, so CustomScheduler can be pointed
+at it through a kubeconfig without any code changes:
+
+    python3 bench/fake_apiserver.py --nodes 1000 --kubeconfig /tmp/fake-kubeconfig
+    KUBECONFIG=/tmp/fake-kubeconfig python3 custom_scheduler.py
+
+Watches honour resourceVersion, allowWatchBookmarks and timeoutSeconds, and answer with
+410 Gone once a resourceVersion has fallen out of the retained event history. An evicted pod
+can be kept terminating (deletionTimestamp set, still on its node) for a while before it is
+deleted, like a kubelet honouring the grace period. Everything is kept in memory; objects are
+plain dicts shaped like the real API's JSON.
+"""
+
+import argparse
+import bisect
+import copy
+import json
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _now_rfc3339():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _merge_patch(target: dict, patch: dict):
+    """Apply a JSON merge patch in place (null deletes a key); also close enough for strategic merge on maps"""
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        elif isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_patch(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+
+
+def _field_value(obj, path: str) -> str:
+    value = obj
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return ""
+        value = value.get(part)
+    return "" if value is None else str(value)
+
+
+def parse_selector(selector: str):
+    """Parse a field or label selector into [(key, op, value)] with op '=' or '!='"""
+    terms = []
+    for term in filter(None, (selector or "").split(",")):
+        match = re.match(r"^\s*([^!=\s]+)\s*(==|=|!=)\s*(.*?)\s*$", term)
+        if not match:
+            raise ValueError(f"unsupported selector term {term!r}")
+        key, op, value = match.groups()
+        terms.append((key, "!=" if op == "!=" else "=", value))
+    return terms
+
+
+def matches(obj, field_terms, label_terms) -> bool:
+    for key, op, value in field_terms:
+        if (_field_value(obj, key) == value) != (op == "="):
+            return False
+    labels = obj.get("metadata", {}).get("labels") or {}
+    for key, op, value in label_terms:
+        if (labels.get(key) == value) != (op == "="):
+            return False
+    return True
+
+
+class _EventLog:
+    """Ordered (resourceVersion, type, object, previous version) history for one resource kind
+
+    The previous version lets a watch tell when a MODIFIED object starts or stops matching its
+    selector, which a real apiserver reports as ADDED or DELETED.
+    """
+
+    def __init__(self, history: int):
+        self.history = history
+        self.rvs = []
+        self.events = []
+        self.latest = {}  # (namespace, name) -> last logged version of each live object
+
+    def append(self, rv: int, event_type: str, obj):
+        key = (obj["metadata"].get("namespace"), obj["metadata"]["name"])
+        previous = self.latest.pop(key, None) if event_type == "DELETED" else self.latest.get(key)
+        if event_type != "DELETED":
+            self.latest[key] = obj
+        self.rvs.append(rv)
+        self.events.append((event_type, obj, previous))
+        if len(self.rvs) > 2 * self.history:
+            del self.rvs[:self.history]
+            del self.events[:self.history]
+
+    def oldest_rv(self) -> int:
+        return self.rvs[0] if self.rvs else 0
+
+    def since(self, rv: int):
+        i = bisect.bisect_right(self.rvs, rv)
+        return list(zip(self.rvs[i:], self.events[i:]))
+
+
+class FakeApiServer:
+    """In-memory pods and nodes behind a localhost HTTP server"""
+
+    def __init__(self, port: int = 0, history: int = 100000, bookmark_interval: float = 5.0,
+                 latency: float = 0.0, termination: float = 0.0):
+        self.port = port
+        self.bookmark_interval = bookmark_interval
+        self.latency = latency  # seconds added to every mutating request, to simulate apiserver RTT
+        self.termination = termination  # seconds an evicted pod terminates for (capped by the eviction's grace period)
+        self.lock = threading.Condition()
+        self.rv = 1
+        self.pods = {}  # (namespace, name) -> pod dict
+        self.nodes = {}  # name -> node dict
+        self.leases = {}  # (namespace, name) -> coordination.k8s.io/v1 Lease dict (not watchable)
+        self.logs = {"pods": _EventLog(history), "nodes": _EventLog(history)}
+        self.stats = {}  # "VERB kind" -> request count
+        self.bindings = 0
+        self.deletions = 0
+        self.evictions = 0
+        self.eviction_blocks = {}  # (namespace, name) -> evictions still to refuse with 429, as a PodDisruptionBudget would
+        self.request_failures = {}  # "VERB kind" (as in stats) -> [status code, requests still to fail]
+        self.grace_periods = {}  # (namespace, name) -> gracePeriodSeconds requested by its eviction
+        self.terminating = {}  # (namespace, name) -> node of an evicted pod that has yet to terminate
+        self.overlapping_binds = 0  # binds onto a node where an evicted pod was still terminating
+        self.created_at = {}  # (namespace, name) -> time.monotonic() of creation
+        self.bound_at = {}  # (namespace, name) -> time.monotonic() of its bind
+        self.deleted_at = {}  # (namespace, name) -> time.monotonic() of its deletion
+        self._httpd = None
+        self._thread = None
+        self._stopping = False
+
+    # ------------------------------------------------------------------ lifecycle
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        server = self
+
+        class Handler(_Handler):
+            api = server
+
+        self._httpd = _QuietHTTPServer(("127.0.0.1", self.port), Handler)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        with self.lock:
+            self.lock.notify_all()
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+    def write_kubeconfig(self, path: str):
+        """Write a kubeconfig pointing at this server (use it via KUBECONFIG)"""
+        kubeconfig = {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "clusters": [{"name": "fake", "cluster": {"server": self.url}}],
+            "users": [{"name": "fake", "user": {"token": "fake"}}],
+            "contexts": [{"name": "fake", "context": {"cluster": "fake", "user": "fake"}}],
+            "current-context": "fake",
+        }
+        with open(path, "w") as f:
+            json.dump(kubeconfig, f)
+        return path
+
+    # ------------------------------------------------------------------ object store
+
+    def _record(self, kind: str, event_type: str, obj):
+        """Bump the resourceVersion, stamp it on obj and log the event (lock held)"""
+        self.rv += 1
+        obj["metadata"]["resourceVersion"] = str(self.rv)
+        self.logs[kind].append(self.rv, event_type, obj)
+        self.lock.notify_all()
+
+    def add_node(self, name: str, labels: dict = None, allocatable: dict = None, unschedulable: bool = False,
+                 taints: list = None, ready: bool = True):
+        node = {
+            "kind": "Node",
+            "apiVersion": "v1",
+            "metadata": {"name": name, "uid": str(uuid.uuid4()), "labels": labels or {},
+                         "creationTimestamp": _now_rfc3339()},
+            "spec": {"unschedulable": unschedulable, "taints": taints},
+            "status": {
+                "allocatable": allocatable or {"cpu": "4", "memory": "16Gi", "pods": "110"},
+                "conditions": [{"type": "Ready", "status": "True" if ready else "False"}],
+            },
+        }
+        with self.lock:
+            event_type = "MODIFIED" if name in self.nodes else "ADDED"
+            self.nodes[name] = node
+            self._record("nodes", event_type, node)
+        return node
+
+    def delete_node(self, name: str):
+        with self.lock:
+            node = self.nodes.pop(name, None)
+            if node is not None:
+                node = copy.deepcopy(node)
+                self._record("nodes", "DELETED", node)
+        return node
+
+    def create_pod(self, manifest: dict, namespace: str = None):
+        """Create a pod from a manifest dict; returns the stored object or None if it already exists"""
+        pod = copy.deepcopy(manifest)
+        pod.setdefault("kind", "Pod")
+        pod.setdefault("apiVersion", "v1")
+        metadata = pod.setdefault("metadata", {})
+        metadata["namespace"] = namespace or metadata.get("namespace") or "default"
+        if "name" not in metadata and "generateName" in metadata:
+            metadata["name"] = metadata["generateName"] + uuid.uuid4().hex[:5]
+        metadata["uid"] = str(uuid.uuid4())
+        metadata["creationTimestamp"] = _now_rfc3339()
+        spec = pod.setdefault("spec", {})
+        spec.setdefault("schedulerName", "default-scheduler")
+        spec.setdefault("containers", [])
+        pod["status"] = {"phase": "Running" if spec.get("nodeName") else "Pending"}
+        key = (metadata["namespace"], metadata["name"])
+        with self.lock:
+            if key in self.pods:
+                return None
+            self.pods[key] = pod
+            self.created_at[key] = time.monotonic()
+            self.bound_at.pop(key, None)
+            self.deleted_at.pop(key, None)
+            self._record("pods", "ADDED", pod)
+        return pod
+
+    def _update_pod(self, key, mutate):
+        """Copy-on-write update of a stored pod (lock held); returns the new object or None"""
+        pod = self.pods.get(key)
+        if pod is None:
+            return None
+        pod = copy.deepcopy(pod)
+        mutate(pod)
+        self.pods[key] = pod
+        self._record("pods", "MODIFIED", pod)
+        return pod
+
+    def bind_pod(self, namespace: str, name: str, node_name: str):
+        """Returns (status code, message)"""
+        with self.lock:
+            pod = self.pods.get((namespace, name))
+            if pod is None:
+                return 404, f'pods "{name}" not found'
+            if pod["spec"].get("nodeName"):
+                return 409, f'pod {name} is already assigned to node "{pod["spec"]["nodeName"]}"'
+            if node_name in self.terminating.values():
+                self.overlapping_binds += 1
+
+            def bind(p):
+                p["spec"]["nodeName"] = node_name
+                p["status"] = {"phase": "Running"}
+            self._update_pod((namespace, name), bind)
+            self.bindings += 1
+            self.bound_at[(namespace, name)] = time.monotonic()
+        return 201, "bound"
+
+    def patch_pod(self, namespace: str, name: str, patch: dict, subresource: str = None):
+        """Merge-patch a pod (metadata/spec, or only status for the status subresource); returns it or None"""
+        if subresource == "status":
+            patch = {"status": patch.get("status") or {}}
+        else:
+            patch = {k: v for k, v in patch.items() if k != "status"}
+
+        def apply(pod):
+            _merge_patch(pod, patch)
+        with self.lock:
+            return copy.deepcopy(self._update_pod((namespace, name), apply))
+
+    def delete_pod(self, namespace: str, name: str):
+        with self.lock:
+            pod = self.pods.pop((namespace, name), None)
+            self.terminating.pop((namespace, name), None)
+            if pod is not None:
+                pod = copy.deepcopy(pod)
+                pod["metadata"]["deletionTimestamp"] = _now_rfc3339()
+                self._record("pods", "DELETED", pod)
+                self.deletions += 1
+                self.deleted_at[(namespace, name)] = time.monotonic()
+        return pod
+
+    def fail_requests(self, request: str, code: int, times: int = 1):
+        """Answer the next `times` requests counted in stats as `request` (e.g. "WATCH pods") with
+        an error status, such as 429 from API priority and fairness or a 503"""
+        with self.lock:
+            self.request_failures[request] = [code, times]
+
+    def block_evictions(self, namespace: str, name: str, times: int):
+        """Refuse the next `times` evictions of a pod with 429 TooManyRequests"""
+        with self.lock:
+            self.eviction_blocks[(namespace, name)] = times
+
+    def evict_pod(self, namespace: str, name: str, grace_period_seconds: int = None):
+        """Returns (status code, message); an allowed eviction deletes the pod once it has terminated"""
+        key = (namespace, name)
+        with self.lock:
+            if key not in self.pods:
+                return 404, f'pods "{name}" not found'
+            if key in self.terminating:
+                return 201, "evicted"
+            if self.eviction_blocks.get(key):
+                self.eviction_blocks[key] -= 1
+                return 429, "Cannot evict pod as it would violate the pod's disruption budget."
+            self.evictions += 1
+            self.grace_periods[key] = grace_period_seconds
+            termination = self.termination if grace_period_seconds is None else min(self.termination, grace_period_seconds)
+            if termination <= 0:
+                self.delete_pod(namespace, name)
+                return 201, "evicted"
+
+            def terminate(p):
+                p["metadata"]["deletionTimestamp"] = _now_rfc3339()
+            self._update_pod(key, terminate)
+            self.terminating[key] = self.pods[key]["spec"].get("nodeName")
+        timer = threading.Timer(termination, self.delete_pod, (namespace, name))
+        timer.daemon = True
+        timer.start()
+        return 201, "evicted"
+
+    def get_lease(self, namespace: str, name: str):
+        with self.lock:
+            return copy.deepcopy(self.leases.get((namespace, name)))
+
+    def create_lease(self, namespace: str, body: dict):
+        """Returns (status code, stored lease or message)"""
+        lease = copy.deepcopy(body)
+        lease.update(kind="Lease", apiVersion="coordination.k8s.io/v1")
+        metadata = lease.setdefault("metadata", {})
+        metadata["namespace"] = namespace
+        key = (namespace, metadata.get("name"))
+        with self.lock:
+            if key in self.leases:
+                return 409, f'leases.coordination.k8s.io "{key[1]}" already exists'
+            metadata["uid"] = str(uuid.uuid4())
+            metadata["creationTimestamp"] = _now_rfc3339()
+            self.rv += 1
+            metadata["resourceVersion"] = str(self.rv)
+            self.leases[key] = lease
+            return 201, copy.deepcopy(lease)
+
+    def update_lease(self, namespace: str, name: str, body: dict):
+        """Replace a lease; a stale metadata.resourceVersion is a 409 like on a real apiserver"""
+        with self.lock:
+            current = self.leases.get((namespace, name))
+            if current is None:
+                return 404, f'leases.coordination.k8s.io "{name}" not found'
+            expected = (body.get("metadata") or {}).get("resourceVersion")
+            if expected and expected != current["metadata"]["resourceVersion"]:
+                return 409, (f'Operation cannot be fulfilled on leases.coordination.k8s.io "{name}": '
+                             "the object has been modified; please apply your changes to the latest version and try again")
+            lease = copy.deepcopy(body)
+            lease.update(kind="Lease", apiVersion="coordination.k8s.io/v1")
+            lease["metadata"] = dict(current["metadata"])
+            self.rv += 1
+            lease["metadata"]["resourceVersion"] = str(self.rv)
+            self.leases[(namespace, name)] = lease
+            return 200, copy.deepcopy(lease)
+
+    def list_objects(self, kind: str, field_selector: str = "", label_selector: str = "", namespace: str = None):
+        field_terms = parse_selector(field_selector)
+        label_terms = parse_selector(label_selector)
+        with self.lock:
+            store = self.pods.values() if kind == "pods" else self.nodes.values()
+            items = [obj for obj in store
+                     if (namespace is None or obj["metadata"].get("namespace") == namespace)
+                     and matches(obj, field_terms, label_terms)]
+            return items, self.rv
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients (the scheduler under test) disconnecting mid-request is expected
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+
+_LIST_KINDS = {"pods": "PodList", "nodes": "NodeList"}
+_ITEM_KINDS = {"pods": "Pod", "nodes": "Node"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, Nagle holds the body back until
+    # the client's delayed ACK (~40ms) on every kept-alive request. Go's apiserver sets it too.
+    disable_nagle_algorithm = True
+    api: FakeApiServer = None
+
+    def log_message(self, format, *args):
+        pass
+
+    # ------------------------------------------------------------------ helpers
+
+    def _count(self, verb: str, kind: str):
+        key = f"{verb} {kind}"
+        with self.api.lock:
+            self.api.stats[key] = self.api.stats.get(key, 0) + 1
+
+    def _send_json(self, code: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _injected_failure(self, verb: str, kind: str) -> bool:
+        """Answer with an error set up by fail_requests(), if one is due"""
+        with self.api.lock:
+            failure = self.api.request_failures.get(f"{verb} {kind}")
+            if not failure or failure[1] <= 0:
+                return False
+            failure[1] -= 1
+        self._send_status(failure[0], HTTPStatus(failure[0]).phrase.replace(" ", ""), f"injected {verb} {kind} failure")
+        return True
+
+    def _send_status(self, code: int, reason: str, message: str):
+        self._send_json(code, {"kind": "Status", "apiVersion": "v1", "metadata": {},
+                               "status": "Success" if code < 300 else "Failure",
+                               "reason": reason, "message": message, "code": code})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _route(self):
+        """Returns (kind, namespace, name, subresource, query)"""
+        parsed = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        parts = [p for p in parsed.path.split("/") if p]
+        if parts[:2] == ["api", "v1"]:
+            parts = parts[2:]
+        elif parts[:3] == ["apis", "coordination.k8s.io", "v1"]:
+            parts = parts[3:]
+        else:
+            return None, None, None, None, query
+        namespace = None
+        if len(parts) >= 2 and parts[0] == "namespaces":
+            namespace = parts[1]
+            parts = parts[2:]
+        kind = parts[0] if parts else None
+        name = parts[1] if len(parts) > 1 else None
+        subresource = parts[2] if len(parts) > 2 else None
+        return kind, namespace, name, subresource, query
+
+    # ------------------------------------------------------------------ verbs
+
+    def do_GET(self):
+        kind, namespace, name, _, query = self._route()
+        if kind == "leases" and name:
+            self._count("GET", kind)
+            lease = self.api.get_lease(namespace, name)
+            if lease is None:
+                return self._send_status(404, "NotFound", f'leases.coordination.k8s.io "{name}" not found')
+            return self._send_json(200, lease)
+        if kind not in _LIST_KINDS:
+            return self._send_status(404, "NotFound", f"unsupported path {self.path}")
+        if name:
+            self._count("GET", kind)
+            with self.api.lock:
+                obj = self.api.pods.get((namespace, name)) if kind == "pods" else self.api.nodes.get(name)
+            if obj is None:
+                return self._send_status(404, "NotFound", f'{kind} "{name}" not found')
+            return self._send_json(200, obj)
+        if query.get("watch", "").lower() in ("true", "1"):  # older clients send "True"
+            self._count("WATCH", kind)
+            if self._injected_failure("WATCH", kind):
+                return
+            return self._watch(kind, namespace, query)
+        self._count("LIST", kind)
+        if self._injected_failure("LIST", kind):
+            return
+        try:
+            items, rv = self.api.list_objects(kind, query.get("fieldSelector", ""),
+                                              query.get("labelSelector", ""), namespace)
+        except ValueError as e:
+            return self._send_status(400, "BadRequest", str(e))
+        self._send_json(200, {"kind": _LIST_KINDS[kind], "apiVersion": "v1",
+                              "metadata": {"resourceVersion": str(rv)}, "items": items})
+
+    def do_POST(self):
+        kind, namespace, name, subresource, _ = self._route()
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        body = self._read_body()
+        if kind == "bindings" or subresource == "binding":
+            self._count("CREATE", "bindings")
+            pod_name = name if subresource == "binding" else body.get("metadata", {}).get("name")
+            node_name = (body.get("target") or {}).get("name")
+            code, message = self.api.bind_pod(namespace, pod_name, node_name)
+            reason = {201: "Created", 404: "NotFound", 409: "Conflict"}[code]
+            return self._send_status(code, reason, message)
+        if kind == "pods" and subresource == "eviction":
+            self._count("CREATE", "evictions")
+            code, message = self.api.evict_pod(namespace, name, (body.get("deleteOptions") or {}).get("gracePeriodSeconds"))
+            reason = {201: "Success", 404: "NotFound", 429: "TooManyRequests"}[code]
+            return self._send_status(code, reason, message)
+        if kind == "leases" and name is None:
+            self._count("CREATE", "leases")
+            code, result = self.api.create_lease(namespace, body)
+            if code != 201:
+                return self._send_status(code, "AlreadyExists", result)
+            return self._send_json(201, result)
+        if kind == "pods" and name is None:
+            self._count("CREATE", "pods")
+            pod = self.api.create_pod(body, namespace)
+            if pod is None:
+                return self._send_status(409, "AlreadyExists", "pod already exists")
+            return self._send_json(201, pod)
+        self._send_status(404, "NotFound", f"unsupported path {self.path}")
+
+    def do_PUT(self):
+        kind, namespace, name, _, _ = self._route()
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        body = self._read_body()
+        if kind == "leases" and name:
+            self._count("UPDATE", "leases")
+            code, result = self.api.update_lease(namespace, name, body)
+            if code != 200:
+                return self._send_status(code, {404: "NotFound", 409: "Conflict"}[code], result)
+            return self._send_json(200, result)
+        self._send_status(404, "NotFound", f"unsupported path {self.path}")
+
+    def do_PATCH(self):
+        kind, namespace, name, subresource, _ = self._route()
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        body = self._read_body()
+        if kind == "pods" and name and subresource in (None, "status"):
+            self._count("PATCH", "pods")
+            if not isinstance(body, dict):
+                return self._send_status(415, "UnsupportedMediaType", "only merge patches are supported")
+            pod = self.api.patch_pod(namespace, name, body, subresource)
+            if pod is None:
+                return self._send_status(404, "NotFound", f'pods "{name}" not found')
+            return self._send_json(200, pod)
+        self._send_status(404, "NotFound", f"unsupported path {self.path}")
+
+    def do_DELETE(self):
+        kind, namespace, name, _, _ = self._route()
+        if self.api.latency:
+            time.sleep(self.api.latency)
+        self._read_body()  # DeleteOptions, unused
+        if kind == "pods" and name:
+            self._count("DELETE", "pods")
+            pod = self.api.delete_pod(namespace, name)
+            if pod is None:
+                return self._send_status(404, "NotFound", f'pods "{name}" not found')
+            return self._send_json(200, pod)
+        self._send_status(404, "NotFound", f"unsupported path {self.path}")
+
+    # ------------------------------------------------------------------ watch
+
+    def _write_event(self, event_type: str, obj):
+        # One chunk per event: the client reads watch streams with chunked reads
+        data = json.dumps({"type": event_type, "object": obj}).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    def _watch(self, kind: str, namespace, query):
+        try:
+            field_terms = parse_selector(query.get("fieldSelector", ""))
+            label_terms = parse_selector(query.get("labelSelector", ""))
+        except ValueError as e:
+            return self._send_status(400, "BadRequest", str(e))
+
+        def wanted(obj):
+            return ((namespace is None or obj["metadata"].get("namespace") == namespace)
+                    and matches(obj, field_terms, label_terms))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            self._stream_events(kind, namespace, query, wanted)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _stream_events(self, kind: str, namespace, query, wanted):
+        api = self.api
+        log = api.logs[kind]
+        timeout = float(query.get("timeoutSeconds") or 1800)
+        bookmarks = query.get("allowWatchBookmarks", "").lower() in ("true", "1")
+        requested_rv = query.get("resourceVersion")
+
+        if requested_rv in (None, "", "0"):
+            # No resourceVersion: start with the current state as ADDED events
+            items, position = api.list_objects(kind, query.get("fieldSelector", ""),
+                                               query.get("labelSelector", ""), namespace)
+            for obj in items:
+                self._write_event("ADDED", obj)
+        else:
+            position = int(requested_rv)
+            with api.lock:
+                expired = log.rvs and position < log.oldest_rv() - 1
+            if expired:
+                self._write_event("ERROR", {"kind": "Status", "apiVersion": "v1", "status": "Failure",
+                                            "reason": "Expired", "code": 410,
+                                            "message": f"too old resource version: {position}"})
+                return
+        self.wfile.flush()
+
+        deadline = time.monotonic() + timeout
+        next_bookmark = time.monotonic() + api.bookmark_interval
+        while not api._stopping:
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            with api.lock:
+                if api.rv <= position:
+                    api.lock.wait(min(deadline, next_bookmark) - now)
+                pending = log.since(position)
+                current_rv = api.rv
+            for _, (event_type, obj, previous) in pending:
+                if event_type == "MODIFIED":
+                    was_wanted, is_wanted = previous is not None and wanted(previous), wanted(obj)
+                    if was_wanted != is_wanted:
+                        # Moved into or out of the selector: a new object or a deletion to this watch
+                        self._write_event("ADDED" if is_wanted else "DELETED", obj)
+                    elif is_wanted:
+                        self._write_event(event_type, obj)
+                elif wanted(obj):
+                    self._write_event(event_type, obj)
+            position = current_rv
+            if bookmarks and time.monotonic() >= next_bookmark:
+                self._write_event("BOOKMARK", {"kind": _ITEM_KINDS[kind], "apiVersion": "v1",
+                                               "metadata": {"resourceVersion": str(position)}})
+                next_bookmark = time.monotonic() + api.bookmark_interval
+            self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Kubernetes API server for scheduler testing")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--nodes", type=int, default=3, help="number of schedulable nodes to create")
+    parser.add_argument("--kubeconfig", default="/tmp/fake-apiserver-kubeconfig")
+    parser.add_argument("--latency-ms", type=float, default=0, help="delay added to every mutating request")
+    parser.add_argument("--termination-ms", type=float, default=0, help="time an evicted pod spends terminating")
+    args = parser.parse_args()
+
+    server = FakeApiServer(port=args.port, latency=args.latency_ms / 1000, termination=args.termination_ms / 1000).start()
+    for i in range(args.nodes):
+        server.add_node(f"fake-node-{i}")
+    server.write_kubeconfig(args.kubeconfig)
+    print(f"Fake API server listening on {server.url} with {args.nodes} nodes")
+    print(f"Run the scheduler against it with: KUBECONFIG={args.kubeconfig} python3 custom_scheduler.py")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for the custom Kubernetes scheduler
+
+Runs the scheduler as a separate process against bench/fake_apiserver.py and drives it through
+a set of scenarios:
+
+  fill     - empty cluster, one pod per node arrives at once
+  storm    - every node holds a low priority pod, then a high priority pod per node arrives
+  churn    - half-full cluster with random deletes and creates
+  mixed    - twice as many pods as nodes with random priorities (placement plus preemption)
+  scaleup  - a tenth of the nodes exist when one pod per node arrives; the rest join in a burst
+  gang     - pod groups (--gang-size members, all required) for 1.5x the nodes, members interleaved
+
+For each scenario it reports pods/sec, p50/p99 scheduling decision latency, p99 bind and eviction latency,
+p50/p99 end-to-end latency (pod created to pod bound), binds onto a node whose evicted pod was
+still terminating (with --termination-ms) and the scheduler's peak RSS, and writes
+everything to a JSON file so runs can be compared:
+
+    python3 bench/scheduler_bench.py --nodes 1000 --output bench_results.json
+    python3 bench/scheduler_bench.py --nodes 1000 --baseline bench_results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_apiserver import FakeApiServer
+
+SCHEDULER_NAME = "custom-scheduler"
+SCENARIOS = ("fill", "storm", "churn", "mixed", "scaleup", "gang")
+
+
+def percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def latency_summary(samples_seconds):
+    return {
+        "count": len(samples_seconds),
+        "p50_ms": _ms(percentile(samples_seconds, 50)),
+        "p99_ms": _ms(percentile(samples_seconds, 99)),
+        "max_ms": _ms(max(samples_seconds) if samples_seconds else None),
+    }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+def pod_manifest(name: str, priority: int, node_name: str = None, requests: dict = None, group: str = None, min_member: int = 0):
+    container = {"name": "c", "image": "busybox"}
+    if requests:
+        container["resources"] = {"requests": requests}
+    manifest = {
+        "metadata": {"name": name, "namespace": "default", "annotations": {"scheduler.priority": str(priority)}},
+        "spec": {"schedulerName": SCHEDULER_NAME, "containers": [container]},
+    }
+    if group:
+        manifest["metadata"]["annotations"].update({"scheduler.pod-group": group, "scheduler.pod-group-min-member": str(min_member)})
+    if node_name:
+        manifest["spec"]["nodeName"] = node_name
+    return manifest
+
+
+# ---------------------------------------------------------------------- scheduler process
+
+def parse_requests(spec: str) -> dict:
+    """"cpu=250m,memory=256Mi" -> {"cpu": "250m", "memory": "256Mi"}"""
+    return dict(item.split("=", 1) for item in spec.split(",")) if spec else {}
+
+
+def scheduler_child(samples_path: str):
+    """Run the scheduler with timing wrappers; dump samples and peak RSS on SIGTERM"""
+    import logging
+    logging.disable(getattr(logging, os.environ.get("BENCH_LOG_LEVEL", "ERROR")) - 1)
+
+    from custom_scheduler import CustomScheduler, scheduler_options_from_env
+    options = scheduler_options_from_env()
+    if os.environ.get("BENCH_ENGINE") == "async":
+        from async_scheduler import AsyncCustomScheduler
+        scheduler = AsyncCustomScheduler(max_in_flight=int(os.environ.get("SCHEDULER_MAX_IN_FLIGHT", "32")), **options)
+    else:
+        scheduler = CustomScheduler(**options)
+
+    samples = {"decision": [], "bind": [], "eviction": []}
+
+    def timed(method, key, per_pod=False):
+        def wrapper(*args):
+            start = time.perf_counter()
+            result = method(*args)
+            elapsed = time.perf_counter() - start
+            if per_pod:
+                samples[key].extend([elapsed / len(args[0])] * len(args[0]))
+            else:
+                samples[key].append(elapsed)
+            return result
+        return wrapper
+
+    scheduler._schedule_pod = timed(scheduler._schedule_pod, "decision")
+    scheduler._schedule_batch = timed(scheduler._schedule_batch, "decision", per_pod=True)
+    scheduler._bind_pod_to_node = timed(scheduler._bind_pod_to_node, "bind")
+
+    finish = scheduler.evictor.finish
+    def eviction_finished(name, namespace, result, started, retries):
+        samples["eviction"].append(time.monotonic() - started)  # per victim, retries included
+        return finish(name, namespace, result, started, retries)
+    scheduler.evictor.finish = eviction_finished
+
+    def dump(signum, frame):
+        samples["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with open(samples_path, "w") as f:
+            json.dump(samples, f)
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, dump)
+    scheduler.run()
+
+
+# ---------------------------------------------------------------------- scenarios
+
+class Scenario:
+    def __init__(self, name: str, args):
+        self.name = name
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.requests = parse_requests(args.pod_requests)
+        self.server = FakeApiServer(latency=args.latency_ms / 1000, termination=args.termination_ms / 1000).start()
+        self.created = []  # names of pods whose scheduling is measured
+        self.driver_deletions = 0  # deletes issued by the scenario itself, not preemptions
+
+    def seed(self):
+        """Cluster state before the scheduler starts"""
+        for i in range(self.args.nodes if self.name != "scaleup" else max(1, self.args.nodes // 10)):
+            self.server.add_node(f"node-{i}")
+        if self.name == "storm":
+            for i in range(self.args.nodes):
+                self.server.create_pod(pod_manifest(f"low-{i}", 10, f"node-{i}", self.requests))
+        elif self.name == "churn":
+            for i in range(self.args.nodes // 2):
+                self.server.create_pod(pod_manifest(f"base-{i}", self.rng.randint(0, 100), f"node-{i}", self.requests))
+
+    def create(self, name: str, priority: int, group: str = None, min_member: int = 0):
+        self.server.create_pod(pod_manifest(name, priority, requests=self.requests, group=group, min_member=min_member))
+        self.created.append(name)
+
+    def drive(self):
+        """Create the measured load; returns the number of binds that mark completion"""
+        nodes = self.args.nodes
+        if self.name == "fill":
+            for i in range(nodes):
+                self.create(f"fill-{i}", self.rng.randint(0, 100))
+            return nodes
+        if self.name == "storm":
+            for i in range(nodes):
+                self.create(f"high-{i}", 90)
+            return nodes
+        if self.name == "churn":
+            # Each delete frees a node, each create fills one. Only bound pods are deleted (with every
+            # node taken, after waiting for one to bind), but a pending pod can still preempt before a
+            # deletion is seen, so the run ends once binds settle
+            live = [f"base-{i}" for i in range(nodes // 2)]
+            for i in range(self.args.pods or nodes):
+                full = len(live) >= nodes
+                if live and (full or self.rng.random() < 0.5):
+                    name = self._pop_bound(live)
+                    deadline = time.monotonic() + self.args.timeout
+                    while name is None and full and time.monotonic() < deadline:
+                        time.sleep(0.01)
+                        name = self._pop_bound(live)
+                    if name is not None:
+                        self.server.delete_pod("default", name)
+                        self.driver_deletions += 1
+                self.create(f"churn-{i}", self.rng.randint(0, 100))
+                live.append(f"churn-{i}")
+            return None
+        if self.name == "scaleup":
+            # Pods beyond the initial nodes park as unschedulable until the autoscaled nodes show up
+            for i in range(nodes):
+                self.create(f"scaleup-{i}", 50)  # equal priorities: no preemption
+            for i in range(max(1, nodes // 10), nodes):
+                self.server.add_node(f"node-{i}")
+            return nodes
+        if self.name == "gang":
+            # Every job's first member arrives, then every job's second, ...: placing members one by
+            # one would leave each job partly running; all or nothing fills the nodes with whole jobs.
+            # How many jobs fit depends on --max-pods-per-node and the requests, so the run ends once
+            # binds settle, and partial groups are counted after that
+            size = self.args.gang_size
+            for member in range(size):
+                for job in range(3 * nodes // 2 // size):
+                    self.create(f"job-{job}-{member}", 50, group=f"job-{job}", min_member=size)
+            return None
+        # mixed: unknown number of binds, finished once the scheduler settles
+        for i in range(self.args.pods or 2 * nodes):
+            self.create(f"mixed-{i}", self.rng.randint(0, 100))
+        return None
+
+    def run(self):
+        self.seed()
+        kubeconfig = self.server.write_kubeconfig(tempfile.mktemp(prefix="bench-kubeconfig-"))
+        samples_path = tempfile.mktemp(prefix="bench-samples-", suffix=".json")
+        env = dict(os.environ, KUBECONFIG=kubeconfig,
+                   BENCH_ENGINE=self.args.engine,
+                   SCHEDULER_NODE_POLICY=self.args.node_policy,
+                   SCHEDULER_WATCH_MODE=self.args.watch_mode,
+                   SCHEDULER_BATCH_INTERVAL_MS=str(self.args.batch_ms),
+                   SCHEDULER_MAX_PODS_PER_NODE=str(self.args.max_pods_per_node),
+                   SCHEDULER_SCORING=self.args.scoring,
+                   SCHEDULER_FAST_BIND=str(self.args.bind_path == "fast"),
+                   SCHEDULER_METRICS_PORT=os.environ.get("SCHEDULER_METRICS_PORT", "0"))
+        child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", samples_path], env=env)
+        try:
+            if not self._wait_until(lambda: self.server.stats.get("WATCH pods", 0) > 0, self.args.timeout):
+                raise RuntimeError("scheduler did not start watching pods")
+            binds_before, deletions_before = self.server.bindings, self.server.deletions
+
+            start = time.monotonic()
+            expected = self.drive()
+            if expected is not None:
+                done = self._wait_until(lambda: self.server.bindings - binds_before >= expected, self.args.timeout)
+            else:
+                done = self._wait_settled(binds_before)
+            end = max(self.server.bound_at.values(), default=start)
+        finally:
+            child.send_signal(signal.SIGTERM)
+            child.wait(timeout=30)
+            self.server.stop()
+
+        with open(samples_path) as f:
+            samples = json.load(f)
+        os.unlink(samples_path)
+        os.unlink(kubeconfig)
+
+        binds = self.server.bindings - binds_before
+        e2e = [self.server.bound_at[("default", name)] - self.server.created_at[("default", name)]
+               for name in self.created if ("default", name) in self.server.bound_at]
+        duration = max(end - start, 1e-9)
+        return {
+            "completed": done,
+            "nodes": self.args.nodes,
+            "pods_created": len(self.created),
+            "binds": binds,
+            "preemptions": self.server.deletions - deletions_before - self.driver_deletions,
+            "nodes_used": len({pod["spec"]["nodeName"] for pod in self.server.pods.values() if pod["spec"].get("nodeName")}),
+            "partial_groups": self._partial_groups(),
+            "overlapping_binds": self.server.overlapping_binds,
+            "duration_s": round(duration, 3),
+            "pods_per_sec": round(binds / duration, 1),
+            "decision_latency": latency_summary(samples["decision"]),
+            "bind_latency": latency_summary(samples["bind"]),
+            "eviction_latency": latency_summary(samples["eviction"]),
+            "e2e_latency": latency_summary(e2e),
+            "peak_rss_mb": round(samples["peak_rss_kb"] / 1024, 1),
+        }
+
+    def _pop_bound(self, names):
+        """Remove and return a random name from names whose pod the server has bound, or None"""
+        start = self.rng.randrange(len(names))
+        for offset in range(len(names)):
+            i = (start + offset) % len(names)
+            pod = self.server.pods.get(("default", names[i]))
+            if pod is not None and pod["spec"].get("nodeName"):
+                name = names[i]
+                names[i] = names[-1]
+                names.pop()
+                return name
+        return None
+
+    def _partial_groups(self):
+        """Pod groups with some but fewer than min-member members bound"""
+        bound, minimum = {}, {}
+        for pod in self.server.pods.values():
+            annotations = pod["metadata"].get("annotations", {})
+            group = annotations.get("scheduler.pod-group")
+            if group:
+                minimum[group] = int(annotations.get("scheduler.pod-group-min-member", 1))
+                bound[group] = bound.get(group, 0) + bool(pod["spec"].get("nodeName"))
+        return sum(0 < bound[group] < minimum[group] for group in bound)
+
+    def _wait_until(self, condition, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def _wait_settled(self, binds_before, quiet=2.0):
+        """Wait until no bind has happened for `quiet` seconds"""
+        deadline = time.monotonic() + self.args.timeout
+        last, last_change = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            if self.server.bindings != last:
+                last, last_change = self.server.bindings, time.monotonic()
+            elif last > binds_before and time.monotonic() - last_change >= quiet:
+                return True
+            time.sleep(0.05)
+        return False
+
+
+# ---------------------------------------------------------------------- reporting
+
+def compare(results, baseline_path: str, tolerance: float):
+    """Print throughput/latency changes against a previous run; returns False on a regression"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["scenarios"]
+    ok = True
+    for name, current in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = current["pods_per_sec"] / before["pods_per_sec"] if before["pods_per_sec"] else float("inf")
+        p99_before = before["decision_latency"]["p99_ms"] or 0
+        p99_now = current["decision_latency"]["p99_ms"] or 0
+        regressed = ratio < 1 - tolerance
+        ok = ok and not regressed
+        print(f"  {name:6s} pods/sec {before['pods_per_sec']:>10} -> {current['pods_per_sec']:>10} ({ratio:.2f}x)"
+              f"  decision p99 {p99_before}ms -> {p99_now}ms{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the custom scheduler against a fake API server")
+    parser.add_argument("--child", metavar="SAMPLES_PATH", help=argparse.SUPPRESS)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma separated subset of " + ",".join(SCENARIOS))
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--pods", type=int, default=0, help="pods for churn/mixed (default: nodes / 2x nodes)")
+    parser.add_argument("--engine", choices=("sync", "async"), default="sync")
+    parser.add_argument("--batch-ms", type=float, default=0, help="SCHEDULER_BATCH_INTERVAL_MS for the scheduler")
+    parser.add_argument("--node-policy", default="first")
+    parser.add_argument("--scoring", default="policy", help="SCHEDULER_SCORING for the scheduler")
+    parser.add_argument("--max-pods-per-node", type=int, default=1, help="SCHEDULER_MAX_PODS_PER_NODE for the scheduler")
+    parser.add_argument("--pod-requests", default="", help="container requests for every pod, e.g. cpu=250m,memory=256Mi "
+                        "(fake nodes have cpu=4, memory=16Gi, pods=110)")
+    parser.add_argument("--gang-size", type=int, default=8, help="members per pod group in the gang scenario")
+    parser.add_argument("--watch-mode", default="all")
+    parser.add_argument("--bind-path", choices=("fast", "client"), default="fast",
+                        help="pre-serialized binds on their own pool, or create_namespaced_binding (SCHEDULER_FAST_BIND=false)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="fake apiserver latency per mutating request")
+    parser.add_argument("--termination-ms", type=float, default=0, help="time an evicted pod spends terminating")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed pods/sec drop vs baseline")
+    args = parser.parse_args()
+
+    if args.child:
+        return scheduler_child(args.child)
+
+    results = {}
+    for name in args.scenarios.split(","):
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name}")
+        print(f"Running {name} ({args.nodes} nodes, {args.engine} engine)...")
+        results[name] = Scenario(name, args).run()
+        r = results[name]
+        print(f"  {r['binds']} binds, {r['preemptions']} preemptions on {r['nodes_used']} nodes in {r['duration_s']}s = {r['pods_per_sec']} pods/sec; "
+              f"decision p50/p99 {r['decision_latency']['p50_ms']}/{r['decision_latency']['p99_ms']}ms; "
+              f"bind p99 {r['bind_latency']['p99_ms']}ms; eviction p99 {r['eviction_latency']['p99_ms']}ms; peak RSS {r['peak_rss_mb']}MB"
+              f"{'; %d partial pod groups' % r['partial_groups'] if name == 'gang' else ''}"
+              f"{'; %d binds onto terminating pods' % r['overlapping_binds'] if args.termination_ms else ''}"
+              f"{'' if r['completed'] else '  (TIMED OUT)'}")
+
+    report = {
+        "started": datetime.now(timezone.utc).isoformat(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("child", "baseline", "output")},
+        "scenarios": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        print(f"Compared with {args.baseline}:")
+        if not compare(results, args.baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
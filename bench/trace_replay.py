@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Record pod workloads from a cluster and replay them against the custom scheduler
+
+A trace is a JSONL file, one event per line, ordered by "t" (seconds since the start of the
+recording):
+
+    {"t": 0.0, "op": "node", "name": "node-a"}
+    {"t": 0.0, "op": "create", "namespace": "default", "name": "web-1", "priority": 50, "node": "node-a"}
+    {"t": 3.21, "op": "create", "namespace": "default", "name": "job-7", "priority": 20}
+    {"t": 9.05, "op": "delete", "namespace": "default", "name": "job-7"}
+
+Creates carrying a "node" are pods that were already running when the recording started; they
+are seeded onto the fake API server before the scheduler starts. Everything else is replayed
+in order at 1x, Nx or maximum speed:
+
+    python3 bench/trace_replay.py record --output trace.jsonl --duration 3600
+    python3 bench/trace_replay.py generate --nodes 200 --pods 2000 --output trace.jsonl
+    python3 bench/trace_replay.py replay trace.jsonl --speed 10 --output replay_results.json
+
+The replay reports the scheduling delay (created to bound) of every pod and, per priority
+class, how many pods were scheduled, never scheduled and preempted.
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fake_apiserver import FakeApiServer
+from scheduler_bench import SCHEDULER_NAME, latency_summary, pod_manifest
+
+
+def load_trace(path: str):
+    """Returns (node names, events sorted by time)"""
+    nodes, events = [], []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            if event["op"] == "node":
+                nodes.append(event["name"])
+            elif event["op"] in ("create", "delete"):
+                events.append(event)
+            else:
+                raise ValueError(f"Unknown trace op {event['op']!r}")
+    events.sort(key=lambda e: e["t"])  # stable, so same-time events keep their recorded order
+    return nodes, events
+
+
+def pod_priority(pod) -> int:
+    """Same rule as CustomScheduler._get_pod_priority"""
+    annotations = pod.metadata.annotations or {}
+    try:
+        return int(annotations.get("scheduler.priority", 0))
+    except ValueError:
+        return 0
+
+
+# ---------------------------------------------------------------------- record
+
+def record(args):
+    """Write the cluster's nodes, current pods and then every pod create/delete to a trace"""
+    from kubernetes import client, config
+    from custom_scheduler import PodCache
+    import logging
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger = logging.getLogger("trace-recorder")
+
+    try:
+        config.load_incluster_config()
+    except config.ConfigException:
+        config.load_kube_config()
+    v1 = client.CoreV1Api()
+
+    selector = None if args.all_schedulers else f"spec.schedulerName={args.scheduler_name}"
+    cache = PodCache(v1, logger, field_selector=selector)
+    cache.WATCH_TIMEOUT_SECONDS = 1  # bounds how long stopping waits for the follow thread
+    lock = threading.Lock()
+    counts = {"create": 0, "delete": 0}
+    start = time.monotonic()
+    stop = threading.Event()
+
+    with open(args.output, "w") as out:
+        def write(event):
+            with lock:
+                out.write(json.dumps(event) + "\n")
+                if event["op"] in counts:
+                    counts[event["op"]] += 1
+
+        for node in v1.list_node().items:
+            write({"t": 0.0, "op": "node", "name": node.metadata.name})
+        cache.list()
+        for pod in sorted(cache.pods.values(), key=lambda p: p.metadata.creation_timestamp):
+            event = {"t": 0.0, "op": "create", "namespace": pod.metadata.namespace,
+                     "name": pod.metadata.name, "priority": pod_priority(pod)}
+            if pod.spec.node_name:
+                event["node"] = pod.spec.node_name
+            write(event)
+
+        def follow():
+            for event_type, pod in cache.watch(stop):
+                if event_type not in ("ADDED", "DELETED"):
+                    continue
+                write({"t": round(time.monotonic() - start, 3),
+                       "op": "create" if event_type == "ADDED" else "delete",
+                       "namespace": pod.metadata.namespace, "name": pod.metadata.name,
+                       "priority": pod_priority(pod)})
+
+        follower = threading.Thread(target=follow, daemon=True)
+        follower.start()
+        if args.duration:
+            logger.info("Recording pod events to %s for %ss", args.output, args.duration)
+        else:
+            logger.info("Recording pod events to %s, Ctrl-C to stop", args.output)
+        try:
+            time.sleep(args.duration) if args.duration else threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        follower.join()  # the watch ends within WATCH_TIMEOUT_SECONDS, before the file closes
+    logger.info("Recorded %d creates and %d deletes", counts["create"], counts["delete"])
+
+# ---------------------------------------------------------------------- generate
+
+def generate(args):
+    """Write a synthetic trace: Poisson arrivals, exponential lifetimes, weighted priorities"""
+    rng = random.Random(args.seed)
+    priorities = [int(p) for p in args.priorities.split(",")]
+    lines = [{"t": 0.0, "op": "node", "name": f"node-{i}"} for i in range(args.nodes)]
+    events = []
+    t = 0.0
+    for i in range(args.pods):
+        t += rng.expovariate(args.rate)
+        name = f"pod-{i}"
+        events.append({"t": round(t, 3), "op": "create", "namespace": "default", "name": name,
+                       "priority": rng.choice(priorities)})
+        if args.mean_lifetime:
+            events.append({"t": round(t + rng.expovariate(1 / args.mean_lifetime), 3), "op": "delete",
+                           "namespace": "default", "name": name})
+    events.sort(key=lambda e: e["t"])
+    with open(args.output, "w") as f:
+        for line in lines + events:
+            f.write(json.dumps(line) + "\n")
+    print(f"Wrote {args.nodes} nodes and {len(events)} events spanning {events[-1]['t'] if events else 0:.1f}s to {args.output}")
+
+
+# ---------------------------------------------------------------------- replay
+
+class Replay:
+    def __init__(self, trace_path: str, args):
+        self.args = args
+        self.trace_nodes, self.events = load_trace(trace_path)
+        self.server = FakeApiServer(latency=args.latency_ms / 1000).start()
+        self.live = {}  # (namespace, recorded name) -> replayed pod key
+        self.pods = {}  # replayed pod key -> {"priority", "seeded"}
+        self.driver_deleted = set()  # replayed pod keys deleted by the trace, not by preemption
+        self.skipped_deletes = 0  # deletes of pods that were already gone (preempted) in the replay
+
+    def _replay_key(self, namespace: str, name: str):
+        """Recorded names can be reused after a delete; give each incarnation its own pod"""
+        key, n = (namespace, name), 1
+        while key in self.pods:
+            n += 1
+            key = (namespace, f"{name}-r{n}")
+        return key
+
+    def _create(self, event, node_name: str = None):
+        key = self._replay_key(event["namespace"], event["name"])
+        manifest = pod_manifest(key[1], event.get("priority", 0), node_name)
+        manifest["metadata"]["namespace"] = key[0]
+        if self.server.create_pod(manifest) is None:
+            return
+        self.live[(event["namespace"], event["name"])] = key
+        self.pods[key] = {"priority": event.get("priority", 0), "seeded": node_name is not None}
+
+    def _delete(self, event):
+        key = self.live.pop((event["namespace"], event["name"]), None)
+        if key is None or self.server.delete_pod(*key) is None:
+            self.skipped_deletes += 1
+            return
+        self.driver_deleted.add(key)
+
+    def seed(self):
+        """Nodes and the pods that were already running when the trace was recorded"""
+        nodes = self.trace_nodes or [f"node-{i}" for i in range(self.args.nodes)]
+        for name in nodes:
+            self.server.add_node(name)
+        replayed = []
+        for event in self.events:
+            if event["op"] == "create" and event.get("node") and event["t"] == 0:
+                if event["node"] not in self.server.nodes:
+                    self.server.add_node(event["node"])
+                self._create(event, event["node"])
+            else:
+                replayed.append(event)
+        self.events = replayed
+        return len(self.server.nodes)
+
+    def play(self):
+        speed = self.args.speed
+        start = time.monotonic()
+        for event in self.events:
+            if speed > 0:
+                delay = start + event["t"] / speed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            if event["op"] == "create":
+                self._create(event)
+            else:
+                self._delete(event)
+        return start
+
+    def _pending(self):
+        with self.server.lock:
+            return sum(1 for pod in self.server.pods.values()
+                       if pod["spec"].get("schedulerName") == SCHEDULER_NAME and not pod["spec"].get("nodeName"))
+
+    def _wait_settled(self, quiet: float = 2.0):
+        """Wait until nothing is pending, or no bind has happened for `quiet` seconds"""
+        deadline = time.monotonic() + self.args.timeout
+        last, last_change = -1, time.monotonic()
+        while time.monotonic() < deadline:
+            if self._pending() == 0:
+                return True
+            if self.server.bindings != last:
+                last, last_change = self.server.bindings, time.monotonic()
+            elif time.monotonic() - last_change >= quiet:
+                return True
+            time.sleep(0.05)
+        return False
+
+    def run(self):
+        nodes = self.seed()
+        kubeconfig = self.server.write_kubeconfig(tempfile.mktemp(prefix="replay-kubeconfig-"))
+        samples_path = tempfile.mktemp(prefix="replay-samples-", suffix=".json")
+        env = dict(os.environ, KUBECONFIG=kubeconfig,
+                   BENCH_ENGINE=self.args.engine,
+                   SCHEDULER_NODE_POLICY=self.args.node_policy,
+                   SCHEDULER_WATCH_MODE=self.args.watch_mode,
+                   SCHEDULER_BATCH_INTERVAL_MS=str(self.args.batch_ms),
+                   SCHEDULER_METRICS_PORT=os.environ.get("SCHEDULER_METRICS_PORT", "0"))
+        child = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "scheduler_bench.py"), "--child", samples_path],
+                                 env=env)
+        try:
+            deadline = time.monotonic() + self.args.timeout
+            while self.server.stats.get("WATCH pods", 0) == 0:
+                if time.monotonic() > deadline or child.poll() is not None:
+                    raise RuntimeError("scheduler did not start watching pods")
+                time.sleep(0.01)
+            start = self.play()
+            replay_seconds = time.monotonic() - start
+            settled = self._wait_settled()
+        finally:
+            child.send_signal(signal.SIGTERM)
+            child.wait(timeout=30)
+            self.server.stop()
+
+        with open(samples_path) as f:
+            samples = json.load(f)
+        os.unlink(samples_path)
+        os.unlink(kubeconfig)
+        return self.report(nodes, replay_seconds, settled, samples)
+
+    def report(self, nodes, replay_seconds, settled, samples):
+        per_pod = []
+        for key, info in self.pods.items():
+            created, bound = self.server.created_at.get(key), self.server.bound_at.get(key)
+            per_pod.append({
+                "namespace": key[0], "name": key[1], "priority": info["priority"], "seeded": info["seeded"],
+                "delay_ms": None if info["seeded"] or bound is None else round((bound - created) * 1000, 3),
+                "preempted": key in self.server.deleted_at and key not in self.driver_deleted,
+            })
+
+        classes = {}
+        for pod in per_pod:
+            c = classes.setdefault(pod["priority"], {"pods": 0, "scheduled": 0, "unscheduled": 0,
+                                                     "preempted": 0, "delays": []})
+            c["pods"] += 1
+            c["preempted"] += pod["preempted"]
+            if pod["seeded"]:
+                continue
+            if pod["delay_ms"] is not None:
+                c["scheduled"] += 1
+                c["delays"].append(pod["delay_ms"] / 1000)
+            elif (pod["namespace"], pod["name"]) not in self.driver_deleted:
+                c["unscheduled"] += 1  # still pending at the end (deleted-while-pending pods are not counted)
+        by_priority = {}
+        for priority in sorted(classes, reverse=True):
+            c = classes[priority]
+            by_priority[str(priority)] = dict(
+                {k: v for k, v in c.items() if k != "delays"}, delay=latency_summary(c.pop("delays")))
+
+        delays = [p["delay_ms"] / 1000 for p in per_pod if p["delay_ms"] is not None]
+        return {
+            "started": datetime.now(timezone.utc).isoformat(),
+            "config": {k: v for k, v in vars(self.args).items() if k not in ("func", "pods_output")},
+            "settled": settled,
+            "nodes": nodes,
+            "trace_events": len(self.events),
+            "trace_seconds": self.events[-1]["t"] if self.events else 0,
+            "replay_seconds": round(replay_seconds, 3),
+            "binds": self.server.bindings,
+            "preemptions": sum(p["preempted"] for p in per_pod),
+            "skipped_deletes": self.skipped_deletes,
+            "scheduling_delay": latency_summary(delays),
+            "decision_latency": latency_summary(samples["decision"]),
+            "by_priority": by_priority,
+        }, per_pod
+
+
+def replay(args):
+    results, per_pod = Replay(args.trace, args).run()
+    print(f"Replayed {results['trace_events']} events ({results['trace_seconds']}s of trace) in "
+          f"{results['replay_seconds']}s on {results['nodes']} nodes: {results['binds']} binds, "
+          f"{results['preemptions']} preemptions{'' if results['settled'] else '  (TIMED OUT)'}")
+    delay = results["scheduling_delay"]
+    print(f"Scheduling delay p50/p99/max {delay['p50_ms']}/{delay['p99_ms']}/{delay['max_ms']}ms")
+    print(f"  {'priority':>8} {'pods':>7} {'scheduled':>9} {'pending':>7} {'preempted':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for priority, c in results["by_priority"].items():
+        print(f"  {priority:>8} {c['pods']:>7} {c['scheduled']:>9} {c['unscheduled']:>7} {c['preempted']:>9} "
+              f"{str(c['delay']['p50_ms']):>9} {str(c['delay']['p99_ms']):>9}")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.pods_output:
+        with open(args.pods_output, "w") as f:
+            for pod in per_pod:
+                f.write(json.dumps(pod) + "\n")
+    print(f"Results written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record pod workloads and replay them against the custom scheduler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("record", help="record pod creates/deletes from the current kubeconfig's cluster")
+    p.add_argument("--output", default="trace.jsonl")
+    p.add_argument("--duration", type=float, default=0, help="seconds to record (default: until Ctrl-C)")
+    p.add_argument("--scheduler-name", default=SCHEDULER_NAME)
+    p.add_argument("--all-schedulers", action="store_true", help="record pods of every scheduler")
+    p.set_defaults(func=record)
+
+    p = commands.add_parser("generate", help="write a synthetic trace")
+    p.add_argument("--output", default="trace.jsonl")
+    p.add_argument("--nodes", type=int, default=100)
+    p.add_argument("--pods", type=int, default=1000)
+    p.add_argument("--rate", type=float, default=20, help="mean pod arrivals per second")
+    p.add_argument("--mean-lifetime", type=float, default=10, help="mean seconds before a pod is deleted (0: never)")
+    p.add_argument("--priorities", default="10,50,90", help="comma separated priorities, picked uniformly")
+    p.add_argument("--seed", type=int, default=1)
+    p.set_defaults(func=generate)
+
+    p = commands.add_parser("replay", help="replay a trace against the scheduler and a fake API server")
+    p.add_argument("trace")
+    p.add_argument("--speed", type=float, default=1, help="time multiplier; 0 replays as fast as possible")
+    p.add_argument("--nodes", type=int, default=100, help="nodes to create if the trace has none")
+    p.add_argument("--engine", choices=("sync", "async"), default="sync")
+    p.add_argument("--batch-ms", type=float, default=0, help="SCHEDULER_BATCH_INTERVAL_MS for the scheduler")
+    p.add_argument("--node-policy", default="first")
+    p.add_argument("--watch-mode", default="all")
+    p.add_argument("--latency-ms", type=float, default=0, help="fake apiserver latency per mutating request")
+    p.add_argument("--timeout", type=float, default=300, help="seconds to wait for the scheduler to settle")
+    p.add_argument("--output", default="replay_results.json")
+    p.add_argument("--pods-output", help="also write one JSON line per replayed pod here")
+    p.set_defaults(func=replay)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,795 @@
+import os
+import sys
+import json
 import time
+import uuid
+import atexit
+import signal
+import socket
+import bisect
+import heapq
+import hashlib
+import queue
+import random
+import math
+import itertools
 import logging
+import threading
+from array import array
+from logging.handlers import QueueHandler, QueueListener
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
+from kubernetes.utils.quantity import parse_quantity
+from urllib3.exceptions import HTTPError
+
+import node_scoring
+import scheduler_metrics as metrics
+from leader_election import LeaderElector
+from eviction import Evictor
+from fast_bind import FastBinder
+
+TEXT_LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed with extra= become top-level keys"""
+
+    STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in self.STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Pass only every Nth DEBUG record per message template; other levels always pass"""
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self.seen = {}  # message template -> DEBUG records seen
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG:
+            return True
+        seen = self.seen.get(record.msg, 0)
+        self.seen[record.msg] = seen + 1
+        return seen % self.every == 0
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted so %-formatting happens on the listener thread"""
+
+    def prepare(self, record):
+        # The stock handler formats here, on the logging thread; log arguments are plain values
+        # (names, numbers), so formatting them later is safe
+        return record
+
+
+def setup_logging(level: str = "INFO", log_format: str = "text", debug_sample: int = 1):
+    """Configure the root logger (unless already configured) to write through a background queue"""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_LOG_FORMAT))
+    queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+    if debug_sample > 1:
+        queue_handler.addFilter(DebugSampler(debug_sample))
+    listener = QueueListener(queue_handler.queue, handler)
+    root.addHandler(queue_handler)
+    # DEBUG applies to our loggers only; the client libraries' debug output is per-request noise
+    root.setLevel(logging.INFO)
+    logging.getLogger("scheduler").setLevel(level.upper())
+    listener.start()
+    atexit.register(listener.stop)
+
+
+class Informer:
+    """Informer-style cache of one resource: LIST once, then keep current from watch deltas
+
+    Subclasses name the resource and its cluster-wide list call.
+    """
+
+    RESOURCE = None  # e.g. "pods"; labels logs and metrics
+    WATCH_TIMEOUT_SECONDS = 300
+    RECONNECT_DELAY_SECONDS = 1
+    MAX_RECONNECT_DELAY_SECONDS = 30
+
+    def __init__(self, v1, logger: logging.Logger, field_selector: str = None):
+        self.v1 = v1
+        self.logger = logger
+        self.field_selector = field_selector  # server-side filter, e.g. "spec.schedulerName=custom-scheduler"
+        self.objects = {}  # key -> object
+        self.resource_version = None
+        self.relists = 0
+
+    def _list_func(self):
+        raise NotImplementedError
+
+    @staticmethod
+    def _key(obj) -> str:
+        return obj.metadata.uid
+
+    def list(self):
+        """Replace the cache contents with a single cluster-wide LIST"""
+        object_list = self._list_func()(field_selector=self.field_selector)
+        self.objects = {self._key(obj): obj for obj in object_list.items}
+        self.resource_version = object_list.metadata.resource_version
+        self.logger.info("%s cache synced: %d %s at resourceVersion %s (field selector: %s)", self.RESOURCE.capitalize(),
+                         len(self.objects), self.RESOURCE, self.resource_version, self.field_selector or 'none')
+
+    def apply(self, event_type: str, obj):
+        """Apply a single watch event to the cache"""
+        if event_type == 'DELETED':
+            self.objects.pop(self._key(obj), None)
+        else:
+            self.objects[self._key(obj)] = obj
+        self.resource_version = obj.metadata.resource_version
+
+    def relist(self):
+        """LIST again and yield the synthetic events that bring the previous cache contents up to date"""
+        previous = self.objects
+        self.list()
+        self.relists += 1
+        for key, obj in previous.items():
+            if key not in self.objects:
+                yield 'DELETED', obj
+        for key, obj in self.objects.items():
+            old = previous.get(key)
+            if old is None:
+                yield 'ADDED', obj
+            elif old.metadata.resource_version != obj.metadata.resource_version:
+                yield 'MODIFIED', obj
+
+    def watch(self, stop: threading.Event = None):
+        """Yield (event_type, object) until stop is set (checked between watch requests), applying each to the cache
+
+        Each watch request resumes from the last seen resourceVersion (kept fresh by bookmarks),
+        so a server-side timeout costs a reconnect rather than a replay of every object. Only an
+        expired resourceVersion (410 Gone) falls back to a full relist. A lost connection, a
+        throttled request (429) or a server error (5xx) is retried with exponential backoff,
+        also when it fails the relist; any other error is raised.
+        """
+        failures = 0
+        relist = False
+        while stop is None or not stop.is_set():
+            try:
+                if relist:
+                    yield from self.relist()
+                    relist = False
+                w = watch.Watch()
+                for event in w.stream(self._list_func(),
+                                      field_selector=self.field_selector,
+                                      resource_version=self.resource_version,
+                                      allow_watch_bookmarks=True,
+                                      timeout_seconds=self.WATCH_TIMEOUT_SECONDS):
+                    failures = 0
+                    event_type = event['type']
+                    if event_type == 'BOOKMARK':
+                        self.resource_version = w.resource_version
+                        continue
+                    obj = event['object']
+                    self.apply(event_type, obj)
+                    yield event_type, obj
+                failures = 0
+                metrics.WATCH_RECONNECTS.labels(self.RESOURCE, "timeout").inc()
+            except ApiException as e:
+                if e.status == 410:
+                    metrics.WATCH_RECONNECTS.labels(self.RESOURCE, "expired").inc()
+                    self.logger.warning("Watch resourceVersion %s expired, relisting %s", self.resource_version, self.RESOURCE)
+                    relist = True
+                    continue
+                if e.status != 429 and not 500 <= (e.status or 0) <= 599:
+                    raise
+                failures += 1
+                delay = self._reconnect_delay(failures)
+                metrics.WATCH_RECONNECTS.labels(self.RESOURCE, "throttled" if e.status == 429 else "error").inc()
+                self.logger.warning("%s %s failed with %s %s, retrying in %.1fs", self.RESOURCE.capitalize(),
+                                    "relist" if relist else "watch", e.status, e.reason, delay)
+                time.sleep(delay)
+            except HTTPError as e:
+                failures += 1
+                delay = self._reconnect_delay(failures)
+                metrics.WATCH_RECONNECTS.labels(self.RESOURCE, "error").inc()
+                self.logger.warning("%s watch connection lost (%s), resuming from resourceVersion %s in %.1fs",
+                                    self.RESOURCE.capitalize(), e, self.resource_version, delay)
+                time.sleep(delay)
+
+    def _reconnect_delay(self, failures: int) -> float:
+        return min(self.RECONNECT_DELAY_SECONDS * 2 ** (failures - 1), self.MAX_RECONNECT_DELAY_SECONDS)
+
+
+class PodCache(Informer):
+    """Pods keyed by uid"""
+
+    RESOURCE = "pods"
+
+    @property
+    def pods(self):
+        return self.objects
+
+    def _list_func(self):
+        return self.v1.list_pod_for_all_namespaces
+
+    def pods_for_scheduler(self, scheduler_name: str):
+        """Cached pods owned by the given scheduler"""
+        return [pod for pod in self.objects.values() if pod.spec.scheduler_name == scheduler_name]
+
+
+class NodeCache(Informer):
+    """Nodes keyed by name, so a node re-created under the same name replaces the old one"""
+
+    RESOURCE = "nodes"
+
+    def _list_func(self):
+        return self.v1.list_node
+
+    @staticmethod
+    def _key(obj) -> str:
+        return obj.metadata.name
+
+    @staticmethod
+    def schedulable(node) -> bool:
+        """Not cordoned, reporting Ready, and without NoSchedule/NoExecute taints
+
+        Our pods carry no tolerations, so any such taint (including the not-ready/unreachable
+        taints the node lifecycle controller adds) keeps them off the node.
+        """
+        if node.spec is not None:
+            if node.spec.unschedulable:
+                return False
+            if any(taint.effect in ("NoSchedule", "NoExecute") for taint in node.spec.taints or ()):
+                return False
+        conditions = node.status.conditions if node.status is not None else None
+        return any(c.type == "Ready" and c.status == "True" for c in conditions or ())
+
+
+class FreeNodePool:
+    """Nodes with room for another pod of ours, with a pluggable tie-break policy for placement
+
+    Policies:
+      first       - lowest position in the node list (original behaviour), O(log n)
+      round-robin - next free node after the last pick, wrapping around, O(log n) lookup
+      random      - uniformly random free node, O(1)
+      lru         - the free node picked least recently (or never), O(1)
+    """
+
+    POLICIES = ("first", "round-robin", "random", "lru")
+
+    def __init__(self, nodes, policy: str = "first"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown node policy {policy!r}, expected one of {self.POLICIES}")
+        self.policy = policy
+        self.order = {}  # node -> position in the node list
+        self._by_order = []
+        self.free = set()
+        self._heap = []  # first: (order, node), lazily pruned
+        self._sorted = []  # round-robin: sorted orders of free nodes
+        self._cursor = 0
+        self._slots = []  # random: free nodes, swap-removed via _slot_of
+        self._slot_of = {}
+        self._lru = OrderedDict()  # lru: free nodes, least recently picked first
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(self.free)
+
+    def __contains__(self, node):
+        return node in self.free
+
+    def add(self, node: str):
+        """Mark a node as free"""
+        if node in self.free:
+            return
+        if node not in self.order:
+            self.order[node] = len(self._by_order)
+            self._by_order.append(node)
+        self.free.add(node)
+        if self.policy == "first":
+            heapq.heappush(self._heap, (self.order[node], node))
+            if len(self._heap) > 2 * len(self.free) + 64:
+                self._heap = [entry for entry in self._heap if entry[1] in self.free]
+                heapq.heapify(self._heap)
+        elif self.policy == "round-robin":
+            bisect.insort(self._sorted, self.order[node])
+        elif self.policy == "random":
+            self._slot_of[node] = len(self._slots)
+            self._slots.append(node)
+        else:
+            self._lru[node] = None
+
+    def discard(self, node: str):
+        """Mark a node as full"""
+        if node not in self.free:
+            return
+        self.free.discard(node)
+        if self.policy == "round-robin":
+            del self._sorted[bisect.bisect_left(self._sorted, self.order[node])]
+        elif self.policy == "random":
+            slot = self._slot_of.pop(node)
+            last = self._slots.pop()
+            if last != node:
+                self._slots[slot] = last
+                self._slot_of[last] = slot
+        elif self.policy == "lru":
+            del self._lru[node]
+        # "first" prunes stale heap entries lazily in pick()
+
+    def pick(self, fits=None):
+        """Choose a free node without removing it (indexing the bound pod does that), or None
+
+        With fits, the policy's choice is tried first and the rest of the free nodes are then
+        scanned in policy order for one the pod fits on.
+        """
+        if not self.free:
+            return None
+        node = self._choice()
+        if fits is not None and not fits(node):
+            node = next((node for node in self._scan() if fits(node)), None)
+            if node is None:
+                return None
+        if self.policy == "round-robin":
+            self._cursor = self.order[node] + 1
+        elif self.policy == "lru":
+            self._lru.move_to_end(node)
+        return node
+
+    def _choice(self):
+        if self.policy == "first":
+            heap = self._heap
+            while heap[0][1] not in self.free:
+                heapq.heappop(heap)
+            return heap[0][1]
+        if self.policy == "round-robin":
+            i = bisect.bisect_left(self._sorted, self._cursor)
+            return self._by_order[self._sorted[i] if i < len(self._sorted) else self._sorted[0]]
+        if self.policy == "random":
+            return random.choice(self._slots)
+        return next(iter(self._lru))
+
+    def _scan(self):
+        """All free nodes in policy order"""
+        if self.policy == "first":
+            return (node for node in self._by_order if node in self.free)
+        if self.policy == "round-robin":
+            i = bisect.bisect_left(self._sorted, self._cursor)
+            return (self._by_order[order] for order in self._sorted[i:] + self._sorted[:i])
+        if self.policy == "random":
+            start = random.randrange(len(self._slots))
+            return iter(self._slots[start:] + self._slots[:start])
+        return iter(list(self._lru))
+
+
+class NodeResources:
+    """Per-node state for filtering and scoring, one compact array per attribute, indexed by row
+
+    CPU is counted in millicores and everything else (memory and ephemeral storage in bytes,
+    pods, extended resources such as nvidia.com/gpu) in whole units. A pod's requests are a
+    tuple of (column, amount) pairs, computed once per pod. Accounting the same pod on the
+    same node again, or releasing a pod that was never accounted, is a no-op.
+
+    Node labels are bitsets: each distinct key=value pair gets a bit, stored 64 to a word.
+    The arrays support the buffer protocol, so node_scoring reads them without copying.
+    """
+
+    BASE_RESOURCES = ("cpu", "memory", "ephemeral-storage", "pods")
+
+    def __init__(self):
+        self.columns = {}  # resource name -> column
+        self.rows = {}  # node -> row
+        self.names = []  # row -> node
+        self.allocatable = []  # per column: array of allocatable amounts, indexed by row
+        self.requested = []  # per column: array of requested amounts, indexed by row
+        self.eligible = array('b')  # 1 for rows in our free pool (schedulable, owned, below max pods)
+        self.label_bits = {}  # (key, value) -> bit
+        self.labels = []  # per 64 bits: array of label words, indexed by row
+        self.pods = {}  # pod uid -> (node, requests) for accounted pods
+        self._raw_allocatable = {}  # node -> status.allocatable last applied
+        self._raw_labels = {}  # node -> metadata.labels last applied
+        for name in self.BASE_RESOURCES:
+            self._column(name)
+
+    def _column(self, name: str) -> int:
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns[name] = len(self.allocatable)
+            self.allocatable.append(array('q', bytes(8 * len(self.rows))))
+            self.requested.append(array('q', bytes(8 * len(self.rows))))
+        return column
+
+    def _row(self, node: str) -> int:
+        row = self.rows.get(node)
+        if row is None:
+            row = self.rows[node] = len(self.rows)
+            self.names.append(node)
+            self.eligible.append(0)
+            for column in (*self.allocatable, *self.requested, *self.labels):
+                column.append(0)
+        return row
+
+    @staticmethod
+    def _amount(name: str, quantity) -> int:
+        value = parse_quantity(quantity)
+        return math.ceil(value * 1000 if name == "cpu" else value)
+
+    def set_allocatable(self, node: str, allocatable: dict) -> bool:
+        """Apply a node's status.allocatable; returns True if it changed"""
+        allocatable = allocatable or {}
+        if self._raw_allocatable.get(node) == allocatable:
+            return False
+        self._raw_allocatable[node] = dict(allocatable)
+        row = self._row(node)
+        for column in self.allocatable:
+            column[row] = 0
+        for name, quantity in allocatable.items():
+            self.allocatable[self._column(name)][row] = self._amount(name, quantity)
+        return True
+
+    def set_labels(self, node: str, labels: dict) -> bool:
+        """Apply a node's labels; returns True if they changed"""
+        labels = labels or {}
+        if self._raw_labels.get(node) == labels:
+            return False
+        self._raw_labels[node] = dict(labels)
+        row = self._row(node)
+        for word in self.labels:
+            word[row] = 0
+        for pair in labels.items():
+            bit = self.label_bits.get(pair)
+            if bit is None:
+                bit = self.label_bits[pair] = len(self.label_bits)
+                if bit // 64 == len(self.labels):
+                    self.labels.append(array('Q', bytes(8 * len(self.rows))))
+            self.labels[bit // 64][row] |= 1 << (bit % 64)
+        return True
+
+    def selector_bits(self, selector: dict):
+        """A nodeSelector as (word, mask) pairs, or None if no node has one of its labels"""
+        masks = Counter()
+        for pair in (selector or {}).items():
+            bit = self.label_bits.get(pair)
+            if bit is None:
+                return None
+            masks[bit // 64] |= 1 << (bit % 64)
+        return tuple(masks.items())
+
+    def set_eligible(self, node: str, eligible: bool):
+        self.eligible[self._row(node)] = eligible
+
+    def requests_of(self, pod) -> tuple:
+        """(column, amount) pairs the pod requests: the larger of its containers' sum and its
+        largest init container, plus pod overhead, plus one pod"""
+        def container_requests(container):
+            return (container.resources.requests or {}) if container.resources else {}
+
+        totals = Counter()
+        for container in pod.spec.containers or ():
+            for name, quantity in container_requests(container).items():
+                totals[name] += self._amount(name, quantity)
+        for container in pod.spec.init_containers or ():
+            for name, quantity in container_requests(container).items():
+                totals[name] = max(totals[name], self._amount(name, quantity))
+        for name, quantity in (pod.spec.overhead or {}).items():
+            totals[name] += self._amount(name, quantity)
+        totals["pods"] = 1
+        return tuple((self._column(name), amount) for name, amount in totals.items() if amount > 0)
+
+    def add_pod(self, uid: str, node: str, requests: tuple):
+        """Count a pod's requests against node"""
+        current = self.pods.get(uid)
+        if current is not None:
+            if current[0] == node:
+                return
+            self.remove_pod(uid)
+        row = self._row(node)
+        for column, amount in requests:
+            self.requested[column][row] += amount
+        self.pods[uid] = (node, requests)
+
+    def remove_pod(self, uid: str):
+        """Stop counting a pod's requests"""
+        current = self.pods.pop(uid, None)
+        if current is not None:
+            node, requests = current
+            row = self.rows[node]
+            for column, amount in requests:
+                self.requested[column][row] -= amount
+
+    def node_of(self, uid: str):
+        current = self.pods.get(uid)
+        return current[0] if current is not None else None
+
+    def fits(self, node: str, requests: tuple, selector: tuple = (), without=()) -> bool:
+        """Whether node carries the selector's labels and requests fit in its unrequested
+        allocatable, optionally with the pods in `without` (uids) gone"""
+        row = self.rows.get(node)
+        if row is None:
+            return False
+        for word, mask in selector:
+            if self.labels[word][row] & mask != mask:
+                return False
+        if without:
+            released = Counter()
+            for uid in without:
+                for column, amount in self.pods[uid][1] if uid in self.pods else ():
+                    released[column] += amount
+            requests = [(column, amount - released[column]) for column, amount in requests]
+        for column, amount in requests:
+            if amount > self.allocatable[column][row] - self.requested[column][row]:
+                return False
+        return True
+
+
+class ShardRing:
+    """Consistent-hash ring mapping node names and pod uids to shards
+
+    Each shard is placed on the ring at VIRTUAL_NODES points; a key belongs to the first shard
+    point at or after its hash. Changing the shard count only moves about 1/N of the keys.
+    """
+
+    VIRTUAL_NODES = 64
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        points = sorted((self._hash(f"shard-{shard}-{i}"), shard)
+                        for shard in range(shards) for i in range(self.VIRTUAL_NODES))
+        self._hashes = [h for h, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        # Stable across processes, unlike hash()
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def owner(self, key: str) -> int:
+        i = bisect.bisect_left(self._hashes, self._hash(key))
+        return self._shards[i % len(self._shards)]
+
+
+class SchedulingQueue:
+    """Pending pods waiting for a scheduling decision
+
+    active:        heap ordered by scheduler.priority (highest first), then creation time
+    backoff:       pods whose last attempt failed, released after an exponential backoff
+    unschedulable: pods no node or victim could be found for, parked until the cluster
+                   changes (a pod is deleted, a node is added) instead of being retried in a loop,
+                   or at the latest for UNSCHEDULABLE_TIMEOUT_SECONDS, in case a change that
+                   matters (e.g. a disruption budget freeing up) produced no event we react to
+    """
+
+    INITIAL_BACKOFF_SECONDS = 1
+    MAX_BACKOFF_SECONDS = 10
+    UNSCHEDULABLE_TIMEOUT_SECONDS = 60
+
+    def __init__(self, priority_of):
+        self.priority_of = priority_of
+        self._active = []  # (-priority, created, seq, uid)
+        self._backoff = []  # (ready_at, seq, uid)
+        self._unschedulable = {}  # uid -> pod
+        self._parked_at = {}  # uid -> monotonic time it was parked as unschedulable
+        self._pods = {}  # uid -> pod for everything queued
+        self._seq = {}  # uid -> seq of its live heap entry (lazy deletion)
+        self._attempts = {}  # uid -> failed attempts, for backoff
+        self._ready_at = {}  # uid -> monotonic time its backoff expires
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._pods)
+
+    def __contains__(self, uid):
+        return uid in self._pods
+
+    def attempts(self, uid: str) -> int:
+        """Failed attempts recorded for a pod since it was last removed"""
+        return self._attempts.get(uid, 0)
+
+    def add(self, pod):
+        """Queue a new pending pod for an immediate attempt"""
+        uid = pod.metadata.uid
+        if uid in self._pods:
+            self._pods[uid] = pod
+            return
+        self._push_active(pod)
+
+    def add_backoff(self, pod):
+        """Requeue a pod after a failed attempt (e.g. a failed bind) with exponential backoff"""
+        uid = pod.metadata.uid
+        self._attempts[uid] = self._attempts.get(uid, 0) + 1
+        delay = min(self.INITIAL_BACKOFF_SECONDS * 2 ** (self._attempts[uid] - 1), self.MAX_BACKOFF_SECONDS)
+        self._ready_at[uid] = time.monotonic() + delay
+        self._unschedulable.pop(uid, None)
+        self._parked_at.pop(uid, None)
+        self._pods[uid] = pod
+        seq = next(self._counter)
+        self._seq[uid] = seq
+        heapq.heappush(self._backoff, (self._ready_at[uid], seq, uid))
+
+    def add_unschedulable(self, pod):
+        """Park a pod that currently fits nowhere until move_all_to_active()"""
+        uid = pod.metadata.uid
+        self._attempts[uid] = self._attempts.get(uid, 0) + 1
+        self._ready_at[uid] = time.monotonic() + min(
+            self.INITIAL_BACKOFF_SECONDS * 2 ** (self._attempts[uid] - 1), self.MAX_BACKOFF_SECONDS)
+        self._seq.pop(uid, None)
+        self._pods[uid] = pod
+        self._unschedulable[uid] = pod
+        self._parked_at[uid] = time.monotonic()
+
+    def move_all_to_active(self, ignore_backoff: bool = False):
+        """The cluster changed: give parked pods another attempt, respecting their backoff unless
+        the change added capacity they could not have used before (a new node)"""
+        now = time.monotonic()
+        for uid in list(self._unschedulable):
+            self._unpark(uid, ignore_backoff or self._ready_at.get(uid, 0) <= now)
+
+    def flush_unschedulable(self):
+        """Give pods parked for longer than UNSCHEDULABLE_TIMEOUT_SECONDS another attempt (after their backoff)"""
+        now = time.monotonic()
+        expired = [uid for uid, parked_at in self._parked_at.items()
+                   if now - parked_at >= self.UNSCHEDULABLE_TIMEOUT_SECONDS]
+        for uid in expired:
+            self._unpark(uid, self._ready_at.get(uid, 0) <= now)
+
+    def _unpark(self, uid: str, ready: bool):
+        """Move a parked pod to active, or to backoff until its backoff expires"""
+        pod = self._unschedulable.pop(uid)
+        del self._parked_at[uid]
+        if ready:
+            self._push_active(pod)
+        else:
+            seq = next(self._counter)
+            self._seq[uid] = seq
+            heapq.heappush(self._backoff, (self._ready_at[uid], seq, uid))
+
+    def remove(self, uid: str):
+        """Forget a pod that was bound or deleted"""
+        self._pods.pop(uid, None)
+        self._seq.pop(uid, None)
+        self._unschedulable.pop(uid, None)
+        self._parked_at.pop(uid, None)
+        self._attempts.pop(uid, None)
+        self._ready_at.pop(uid, None)
+
+    def pop(self):
+        """Highest priority pod ready for an attempt, or None"""
+        self._flush_backoff()
+        while self._active:
+            _, _, seq, uid = heapq.heappop(self._active)
+            if self._seq.get(uid) == seq:
+                del self._seq[uid]
+                return self._pods.pop(uid)
+        return None
+
+    def wait_time(self, default: float = 1.0) -> float:
+        """Seconds until pop() can return something (0 if it can now), capped at default"""
+        if self._active_ready():
+            return 0
+        while self._backoff and self._seq.get(self._backoff[0][2]) != self._backoff[0][1]:
+            heapq.heappop(self._backoff)
+        if self._backoff:
+            return min(default, max(0, self._backoff[0][0] - time.monotonic()))
+        return default
+
+    def _active_ready(self):
+        while self._active and self._seq.get(self._active[0][3]) != self._active[0][2]:
+            heapq.heappop(self._active)
+        return bool(self._active)
+
+    def _flush_backoff(self):
+        now = time.monotonic()
+        while self._backoff and self._backoff[0][0] <= now:
+            _, seq, uid = heapq.heappop(self._backoff)
+            if self._seq.get(uid) == seq:
+                self._push_active(self._pods[uid])
+
+    def _push_active(self, pod):
+        uid = pod.metadata.uid
+        created = pod.metadata.creation_timestamp
+        created = created.timestamp() if created else time.time()
+        seq = next(self._counter)
+        self._seq[uid] = seq
+        self._pods[uid] = pod
+        heapq.heappush(self._active, (-self.priority_of(pod), created, seq, uid))
+
+
+class PodGroup:
+    """Our pods sharing a scheduler.pod-group annotation in one namespace (a gang)
+
+    No member is bound until min_member of them can be: members wait in the permit stage,
+    without holding a node, until enough have arrived and all of those fit at once.
+    """
+
+    def __init__(self, namespace: str, name: str):
+        self.namespace = namespace
+        self.name = name
+        self.min_member = 1  # from the members' scheduler.pod-group-min-member annotation
+        self.members = {}  # pod uid -> latest pod, pending or placed
+
+
+class Nomination:
+    """A preemptor's node, reserved from the moment its victims are chosen until it is bound
+
+    The pod is bound only after every victim has been evicted and its DELETED event seen, so it
+    never lands on a node that is still running a terminating victim.
+    """
+
+    def __init__(self, pod, node_name: str, victims):
+        self.pod = pod
+        self.node_name = node_name
+        self.evicting = set(victims)  # victim uids whose eviction is outstanding
+        self.terminating = set()  # evicted victim uids whose deletion the watch hasn't shown yet
+        self.failed = []  # names of victims that stayed
 
 
 class CustomScheduler:
-    def __init__(self, scheduler_name: str = "custom-scheduler"):
+    # all:       watch every pod and filter client-side
+    # scheduler: server-side filter on spec.schedulerName
+    # pending:   watch only our unbound pods, plus a second watch for our bound pods (for deletions)
+    WATCH_MODES = ("all", "scheduler", "pending")
+    
+    BIND_WORKERS = 8
+    EVICTION_WORKERS = 16  # victims evicted at once; a budget-blocked one holds a worker while it retries
+    BLOCKED_VICTIM_SECONDS = 30  # a victim a disruption budget kept us from evicting isn't picked again for this long
+    VICTIM_SEARCH_STEPS = 500  # branch and bound steps per node when choosing victims
+    BIND_TIMEOUT_SECONDS = 30
+    ASSUME_TTL_SECONDS = 60  # an assumed pod not confirmed by the watch by then is rolled back
+    SHARD_ANNOTATION = "scheduler.shard"  # set when a pod is handed off to another shard
+    SHARD_HOPS_ANNOTATION = "scheduler.shard-hops"
+    POD_GROUP_ANNOTATION = "scheduler.pod-group"
+    MIN_MEMBER_ANNOTATION = "scheduler.pod-group-min-member"
+
+    def __init__(self, scheduler_name: str = "custom-scheduler", node_policy: str = "first",
+                 watch_mode: str = "all", batch_interval: float = 0, metrics_port: int = 0,
+                 log_level: str = "INFO", log_format: str = "text", debug_sample: int = 1,
+                 leader_elect: bool = False, lease_namespace: str = "scheduling", shards: int = 1, shard: int = 0,
+                 max_pods_per_node: int = 1, scoring: str = "policy", eviction_grace_period: int = None,
+                 eviction_timeout: float = 30, fast_bind: bool = True):
+        if not 0 <= eviction_timeout < self.ASSUME_TTL_SECONDS:
+            raise ValueError(f"eviction_timeout must be in [0, {self.ASSUME_TTL_SECONDS}): the node is reserved meanwhile")
+        if scoring not in ("policy",) + node_scoring.STRATEGIES:
+            raise ValueError(f"Unknown scoring {scoring!r}, expected policy or one of {node_scoring.STRATEGIES}")
+        if max_pods_per_node < 1:
+            raise ValueError("max_pods_per_node must be at least 1")
+        if not 0 <= shard < shards:
+            raise ValueError(f"Shard {shard} out of range for {shards} shards")
+        if watch_mode not in self.WATCH_MODES:
+            raise ValueError(f"Unknown watch mode {watch_mode!r}, expected one of {self.WATCH_MODES}")
         self.scheduler_name = scheduler_name
-        self.logger = self._setup_logging()
+        self.watch_mode = watch_mode
+        self.batch_interval = batch_interval  # seconds between batch cycles; 0 schedules one pod per cycle
+        self.max_pods_per_node = max_pods_per_node  # pods of ours per node, on top of resources fitting
+        self.scoring = scoring  # node_scoring strategy, or "policy" for the node policy's pick
+        self._last_batch = 0
+        self.metrics_port = metrics_port  # Prometheus /metrics port started by run(); 0 disables it
+        self.leader_elect = leader_elect
+        self.lease_namespace = lease_namespace
+        self.identity = os.environ.get("POD_NAME") or f"{socket.gethostname()}_{uuid.uuid4().hex[:8]}"
+        self.elector = None
+        self._leading = not leader_elect  # standbys keep their caches and index warm but don't schedule
+        self.shards = shards
+        self.shard = shard
+        self.shard_ring = ShardRing(shards)
+        self.node_shard = {}  # node -> owning shard
+        self.foreign_free = {s: set() for s in range(shards) if s != shard}  # other shards' nodes with room
+        self.foreign_victim_heap = []  # like victim_heap, for pods on other shards' nodes
+        self._handed_off = {}  # pod uid -> shard we handed it to, while it is still pending
+        self._promised = Counter()  # shard -> pods handed to it that are still pending
+        self._hand_offs_in_flight = set()  # pod uids whose hand-off patch hasn't completed
+        self.logger = self._setup_logging(log_level, log_format, debug_sample)
         
         # Load Kubernetes config
         try:
@@ -15,49 +797,181 @@ class CustomScheduler:
         except:
             config.load_kube_config()
         
-        self.v1 = client.CoreV1Api()
-        self.nodes = []
-        self.node_pod_count = {}  # Track pods per node for one-pod-per-node constraint
-        self._get_nodes()
+        # One client for every API call, so the informers, evictor and binder share its connection pool
+        configuration = client.Configuration.get_default_copy()
+        configuration.connection_pool_maxsize = max(configuration.connection_pool_maxsize, self._api_calls_in_flight())
+        self.v1 = client.CoreV1Api(client.ApiClient(configuration))
+        self.evictor = Evictor(self.v1, self.logger, eviction_grace_period, eviction_timeout)
+        # Binds skip the generated client's models; None sends them through create_namespaced_binding
+        self.binder = FastBinder(self.v1.api_client, self._api_calls_in_flight(), self.BIND_TIMEOUT_SECONDS) if fast_bind else None
+        self.node_cache = NodeCache(self.v1, self.logger)
+        self.nodes = {}  # schedulable node names (values unused), in the order they were discovered
+        self.node_pods = {}  # node -> {pod uid -> (priority, namespace, name, requests)} for pods owned by our scheduler
+        self.pod_nodes = {}  # pod uid -> node, reverse of node_pods
+        self.victim_heap = []  # (priority, seq, uid) min-heap over indexed pods, lazily pruned
+        self._victim_seq = {}  # pod uid -> seq of its live heap entry
+        self._terminating = set()  # indexed pod uids being deleted: they hold their node until DELETED but are no victims
+        self._heap_counter = itertools.count()
+        self.free_nodes = FreeNodePool([], node_policy)  # our schedulable nodes with fewer than max_pods_per_node of our pods
+        self.node_resources = NodeResources()  # allocatable and requested per node, for every pod we can see
+        self.assumed_pods = {}  # pod uid -> (pod, node, deadline) for reservations awaiting bind confirmation
+        self._queued_at = {}  # pod uid -> monotonic time it was first queued, for end-to-end latency
+        self.pod_groups = {}  # (namespace, group name) -> PodGroup of our live pods
+        self.scheduling_queue = SchedulingQueue(self._get_pod_priority)
+        self._put = None  # scheduling loop queue put(), set by run()
+        self._bind_executor = None  # binds run inline until run() starts the executor
+        self._eviction_executor = None  # likewise for evictions
+        self.nominations = {}  # preemptor uid -> Nomination, until the preemptor is bound or released
+        self._nominator = {}  # victim uid -> uid of the preemptor waiting for it to go
+        self._blocked_victims = {}  # pod uid -> monotonic time until which preemption passes it over
+        self._next_expiry_check = 0
+        self._setup_pod_caches()
         self._init_node_tracking()
         
-    def _setup_logging(self) -> logging.Logger:
+    def _api_calls_in_flight(self) -> int:
+        """Most API calls issued at once, which sizes the connection pools"""
+        return self.BIND_WORKERS
+    
+    def _setup_logging(self, level: str, log_format: str, debug_sample: int) -> logging.Logger:
         """Set up logging configuration"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        setup_logging(level, log_format, debug_sample)
         return logging.getLogger(f"scheduler.{self.scheduler_name}")
     
+    def _setup_pod_caches(self):
+        """Create the pod informers for the configured watch mode"""
+        self.pending_cache = None  # set only when bound pods come from a separate watch
+        if self.watch_mode == "all":
+            self.pod_cache = PodCache(self.v1, self.logger)
+            self.pod_caches = [self.pod_cache]
+        elif self.watch_mode == "scheduler":
+            self.pod_cache = PodCache(self.v1, self.logger, f"spec.schedulerName={self.scheduler_name}")
+            self.pod_caches = [self.pod_cache]
+        else:
+            # A pod leaving the pending selector on bind shows up there as DELETED; the bound watch
+            # sees it as ADDED, so only the bound watch drives the node index
+            self.pending_cache = PodCache(self.v1, self.logger, f"spec.schedulerName={self.scheduler_name},spec.nodeName=")
+            self.pod_cache = PodCache(self.v1, self.logger, f"spec.schedulerName={self.scheduler_name},spec.nodeName!=")
+            self.pod_caches = [self.pod_cache, self.pending_cache]
+    
+    def _cached_pod(self, uid: str):
+        """Latest cached copy of a pod from any informer, or None"""
+        for cache in self.pod_caches:
+            pod = cache.pods.get(uid)
+            if pod is not None:
+                return pod
+        return None
+    
+    def _cached_pods(self):
+        """Cached pods owned by our scheduler across all informers"""
+        for cache in self.pod_caches:
+            yield from cache.pods_for_scheduler(self.scheduler_name)
+    
     def _get_nodes(self):
-        """Get list of schedulable nodes"""
+        """List nodes into the node cache and start tracking the schedulable ones"""
         try:
-            nodes = self.v1.list_node()
-            self.nodes = []
-            for node in nodes.items:
-                if not node.spec.unschedulable:
-                    self.nodes.append(node.metadata.name)
-                    self.logger.info(f"Found node: {node.metadata.name}")
+            self.node_cache.list()
+            for node in self.node_cache.objects.values():
+                self.node_resources.set_allocatable(node.metadata.name, node.status.allocatable if node.status else None)
+                self.node_resources.set_labels(node.metadata.name, node.metadata.labels)
+                if NodeCache.schedulable(node):
+                    self._add_node(node.metadata.name)
+            self.logger.info("Found %d schedulable nodes", len(self.nodes))
         except ApiException as e:
-            self.logger.error(f"Error listing nodes: {e}")
+            self.logger.error("Error listing nodes: %s", e)
+    
+    @property
+    def node_pod_count(self):
+        """Pods of ours per node for the max-pods-per-node constraint, derived from the node index"""
+        return {node: len(pods) for node, pods in self.node_pods.items()}
     
     def _init_node_tracking(self):
-        """Initialize node pod count tracking"""
-        for node in self.nodes:
-            self.node_pod_count[node] = 0
+        """Initialize the node inventory and the per-node pod index"""
+        self.nodes = {}
+        self.node_pods = {}
+        self.pod_nodes = {}
+        self.node_shard = {}
+        self.free_nodes = FreeNodePool([], self.free_nodes.policy)
+        self.node_resources = NodeResources()
+        for free in self.foreign_free.values():
+            free.clear()
+        self.victim_heap = []
+        self.foreign_victim_heap = []
+        self._victim_seq = {}
+        self._terminating = set()
+        self._get_nodes()
         
-        # Count existing pods scheduled by our scheduler
+        # Sync the pod cache once and index existing pods scheduled by our scheduler
         try:
-            all_pods = self.v1.list_pod_for_all_namespaces()
-            for pod in all_pods.items:
-                if (pod.spec.scheduler_name == self.scheduler_name and 
-                    pod.spec.node_name in self.nodes):
-                    self.node_pod_count[pod.spec.node_name] += 1
-                    self.logger.info(f"Existing pod {pod.metadata.name} on node {pod.spec.node_name}")
+            for cache in self.pod_caches:
+                cache.list()
+            self.pod_groups = {}
+            for pod in self._cached_pods():
+                self._track_pod_group('ADDED', pod)
+                if pod.spec.node_name:
+                    if pod.metadata.deletion_timestamp is not None:
+                        self._set_terminating(pod.metadata.uid)
+                    self._index_pod(pod, pod.spec.node_name)
+                    self.logger.debug("Existing pod %s on node %s", pod.metadata.name, pod.spec.node_name)
+            for cache in self.pod_caches:
+                for pod in cache.pods.values():
+                    if pod.spec.scheduler_name != self.scheduler_name:
+                        self._account_other_pod('ADDED', pod)
         except ApiException as e:
-            self.logger.error(f"Error counting existing pods: {e}")
+            self.logger.error("Error counting existing pods: %s", e)
         
-        self.logger.info(f"Node pod counts: {self.node_pod_count}")
+        self.logger.info("Indexed %d existing pods; %d of %d nodes free", len(self.pod_nodes), len(self.free_nodes), len(self.nodes))
+        if self.shards > 1:
+            self.logger.info("Shard %d of %d owns %d nodes", self.shard, self.shards, sum(map(self._owns_node, self.nodes)))
+    
+    def _track_node(self, node_name: str):
+        """Start indexing pods on a node, schedulable or not"""
+        if node_name not in self.node_pods:
+            self.node_pods[node_name] = {}
+            self.node_shard[node_name] = self.shard_ring.owner(node_name)
+    
+    def _add_node(self, node_name: str):
+        """Make a node available for placement: free if empty, otherwise its pods become victims"""
+        if node_name in self.nodes:
+            return
+        self._track_node(node_name)
+        self.nodes[node_name] = None
+        self._update_node_room(node_name)
+        for uid, (priority, *_) in self.node_pods[node_name].items():
+            if uid not in self._terminating:
+                self._push_victim(uid, priority, node_name)
+        self.logger.debug("Node %s is schedulable", node_name)
+    
+    def _remove_node(self, node_name: str, reason: str):
+        """Stop placing pods on a node; pods already there stay indexed but can't be preempted for it"""
+        if node_name not in self.nodes:
+            return
+        del self.nodes[node_name]
+        self._update_node_room(node_name)  # out of the free pools
+        for uid in self.node_pods[node_name]:
+            self._victim_seq.pop(uid, None)  # the heap entries go stale
+        self.logger.debug("Node %s is no longer schedulable: %s", node_name, reason)
+    
+    def _handle_node_event(self, event_type: str, node):
+        """Keep the node inventory current from one node watch event"""
+        node_name = node.metadata.name
+        if event_type == 'DELETED':
+            self._remove_node(node_name, "deleted")
+            if node_name in self.node_pods and not self.node_pods[node_name]:
+                del self.node_pods[node_name]
+                del self.node_shard[node_name]
+            return
+        resized = self.node_resources.set_allocatable(node_name, node.status.allocatable if node.status else None)
+        relabeled = self.node_resources.set_labels(node_name, node.metadata.labels)
+        if NodeCache.schedulable(node):
+            if node_name not in self.nodes:
+                # Autoscaled nodes arrive one watch event at a time; don't make parked pods sit
+                # out a backoff earned while the rest of the burst was still on its way
+                self._add_node(node_name)
+                self.scheduling_queue.move_all_to_active(ignore_backoff=True)
+            elif resized or relabeled:
+                self.scheduling_queue.move_all_to_active()
+        else:
+            self._remove_node(node_name, "cordoned" if node.spec.unschedulable else "not ready or tainted")
     
     def _get_pod_priority(self, pod):
         """Extract priority from pod annotations"""
@@ -68,184 +982,1073 @@ class CustomScheduler:
                 pass
         return 0  # Default priority
     
-    def _find_available_node(self):
-        """Find a node with available capacity (one-pod-per-node constraint)"""
-        for node in self.nodes:
-            if self.node_pod_count.get(node, 0) == 0:
-                return node
+    def _index_pod(self, pod, node_name: str):
+        """Record a pod of ours as occupying node_name (idempotent per pod uid)"""
+        uid = pod.metadata.uid
+        existing = self.node_pods.get(node_name, {}).get(uid)
+        requests = existing[3] if existing is not None else self.node_resources.requests_of(pod)
+        entry = (self._get_pod_priority(pod), pod.metadata.namespace, pod.metadata.name, requests)
+        self._index_entry(uid, node_name, entry)
+    
+    def _index_entry(self, uid: str, node_name: str, entry: tuple):
+        """Record a (priority, namespace, name, requests) index entry for uid on node_name"""
+        priority = entry[0]
+        previous = self.pod_nodes.get(uid)
+        if previous is not None and previous != node_name:
+            self._unindex_pod(uid)
+        self._track_node(node_name)
+        existing = self.node_pods[node_name].get(uid)
+        self.node_pods[node_name][uid] = entry
+        self.pod_nodes[uid] = node_name
+        self.node_resources.add_pod(uid, node_name, entry[3])
+        self._update_node_room(node_name)
+        # Pods on unschedulable nodes are indexed but not offered as victims until the node returns
+        if node_name in self.nodes and uid not in self._terminating and (existing is None or existing[0] != priority):
+            self._push_victim(uid, priority, node_name)
+    
+    def _set_terminating(self, uid: str, terminating: bool = True):
+        """Withdraw a pod being deleted from the preemption victims (or offer it again); it stays
+        indexed, holding its node and resources, until its DELETED event"""
+        if terminating:
+            self._terminating.add(uid)
+            self._victim_seq.pop(uid, None)  # the heap entry becomes stale
+        elif uid in self._terminating:
+            self._terminating.discard(uid)
+            node_name = self.pod_nodes.get(uid)
+            if node_name in self.nodes:
+                self._push_victim(uid, self.node_pods[node_name][uid][0], node_name)
+    
+    def _unindex_pod(self, uid: str):
+        """Drop a pod from the node index; returns the node it occupied, if any"""
+        node_name = self.pod_nodes.pop(uid, None)
+        if node_name is not None:
+            node_pods = self.node_pods.get(node_name, {})
+            node_pods.pop(uid, None)
+            self.node_resources.remove_pod(uid)
+            if node_name in self.nodes:
+                self._update_node_room(node_name)
+            elif not node_pods and node_name not in self.node_cache.objects:
+                # Last pod off a node that has left the cluster
+                self.node_pods.pop(node_name, None)
+                self.node_shard.pop(node_name, None)
+            # The heap entry becomes stale and is discarded when it reaches the top
+            self._victim_seq.pop(uid, None)
+        return node_name
+    
+    def _owns_node(self, node_name: str) -> bool:
+        """Whether this shard places pods on node_name (always true without sharding)"""
+        return self.node_shard.get(node_name, self.shard) == self.shard
+    
+    def _update_node_room(self, node_name: str):
+        """Put a node in (or take it out of) its shard's free pool: schedulable and below max_pods_per_node"""
+        owned = self._owns_node(node_name)
+        free = self.free_nodes if owned else self.foreign_free[self.node_shard[node_name]]
+        room = node_name in self.nodes and len(self.node_pods[node_name]) < self.max_pods_per_node
+        if room:
+            free.add(node_name)
+        else:
+            free.discard(node_name)
+        if owned:
+            self.node_resources.set_eligible(node_name, room)
+    
+    def _account_other_pod(self, event_type: str, pod):
+        """Count another scheduler's pod against its node's resources while it is there (terminating included)"""
+        uid = pod.metadata.uid
+        if (event_type == 'DELETED' or not pod.spec.node_name
+                or (pod.status is not None and pod.status.phase in ("Succeeded", "Failed"))):
+            node_name = self.node_resources.node_of(uid)
+            self.node_resources.remove_pod(uid)
+            if node_name in self.nodes:
+                self.scheduling_queue.move_all_to_active()
+        elif self.node_resources.node_of(uid) != pod.spec.node_name:
+            self.node_resources.add_pod(uid, pod.spec.node_name, self.node_resources.requests_of(pod))
+    
+    def _push_victim(self, uid: str, priority: int, node_name: str):
+        """Add a heap entry for an indexed pod, superseding any older entry for the same uid"""
+        seq = next(self._heap_counter)
+        self._victim_seq[uid] = seq
+        owned = self._owns_node(node_name)
+        heap = self.victim_heap if owned else self.foreign_victim_heap
+        heapq.heappush(heap, (priority, seq, uid))
+        
+        # Rebuild once stale entries dominate so lazy deletion doesn't grow the heap without bound
+        if len(heap) > 2 * len(self._victim_seq) + 64:
+            heap = [entry for entry in heap if self._victim_seq.get(entry[2]) == entry[1]]
+            heapq.heapify(heap)
+            if owned:
+                self.victim_heap = heap
+            else:
+                self.foreign_victim_heap = heap
+    
+    def _lowest_priority_pod(self, heap=None):
+        """Return (priority, uid) of the lowest priority indexed pod on our nodes (or in heap), or None"""
+        heap = self.victim_heap if heap is None else heap
+        while heap:
+            priority, seq, uid = heap[0]
+            if self._victim_seq.get(uid) == seq:
+                return priority, uid
+            heapq.heappop(heap)
         return None
     
+    def _victims(self, heap):
+        """Live (priority, uid) entries of a victim heap, lowest priority first
+
+        The heap top comes straight off the heap; the rest are popped one by one from a copy only
+        if the caller reads on, so stopping after a few victims costs a copy, not a sort.
+        """
+        lowest = self._lowest_priority_pod(heap)
+        if lowest is None:
+            return
+        yield lowest
+        rest = heap[:]
+        heapq.heappop(rest)
+        while rest:
+            priority, seq, uid = heapq.heappop(rest)
+            if self._victim_seq.get(uid) == seq:
+                yield priority, uid
+    
+    def _pod_demand(self, pod):
+        """(requests, node selector bits) to fit the pod, or None if no node has its selector's labels"""
+        selector = self.node_resources.selector_bits(pod.spec.node_selector)
+        if selector is None:
+            return None
+        return self.node_resources.requests_of(pod), selector
+    
+    def _node_victims(self, node_name: str, priority: int, demand: tuple, cost_to_beat: tuple = None):
+        """The cheapest pods below priority to evict from node_name to make room for demand, or None
+        if there are none (or none cheaper than cost_to_beat)
+
+        A branch and bound over the candidates, lowest priority first, for the set with the
+        smallest total priority, then the fewest evictions. It starts from the greedy set, and
+        a branch is cut once the pods left can't cover what the node lacks, or once it can't
+        beat the best set found. Only sets that need every victim count, so no pod is evicted
+        just because its negative priority lowers the total. After VICTIM_SEARCH_STEPS the best
+        set found so far is used.
+        """
+        requests, selector = demand
+        resources = self.node_resources
+        if not resources.fits(node_name, (), selector):
+            return None
+        now = time.monotonic()
+        candidates = sorted((entry[0], uid) for uid, entry in self.node_pods[node_name].items()
+                            if entry[0] < priority and uid not in self._terminating
+                            and self._blocked_victims.get(uid, 0) <= now)
+        
+        # What the node lacks, per short resource plus pods of ours over max_pods_per_node, and what
+        # each candidate's eviction gives back of it
+        row = resources.rows[node_name]
+        short = [(column, amount - (resources.allocatable[column][row] - resources.requested[column][row]))
+                 for column, amount in requests]
+        short = [(column, missing) for column, missing in short if missing > 0]
+        lacking = tuple(missing for _, missing in short) + (len(self.node_pods[node_name]) - self.max_pods_per_node + 1,)
+        if all(missing <= 0 for missing in lacking):
+            return None  # nothing to evict for; the node has room
+        if not candidates:
+            return None
+        releases = []
+        for _, uid in candidates:
+            released = dict(resources.pods[uid][1]) if uid in resources.pods else {}
+            releases.append(tuple(released.get(column, 0) for column, _ in short) + (1,))
+        if candidates[0][0] >= 0 and all(missing <= back for missing, back in zip(lacking, releases[0])):
+            # The usual case: no set beats the lowest priority pod alone
+            cost = (candidates[0][0], 1)
+            return [candidates[0][1]] if cost_to_beat is None or cost < cost_to_beat else None
+        # From candidate i on: what all of them give back, and the lowest total they can add
+        rest = [(0,) * len(lacking)] * (len(candidates) + 1)
+        lowest_rest = [0] * (len(candidates) + 1)
+        for i in range(len(candidates) - 1, -1, -1):
+            rest[i] = tuple(a + b for a, b in zip(rest[i + 1], releases[i]))
+            lowest_rest[i] = lowest_rest[i + 1] + min(candidates[i][0], 0)
+        if any(missing > back for missing, back in zip(lacking, rest[0])):
+            return None
+        
+        # Start from the greedy set: lowest priority first until the demand fits, then each victim
+        # reprieved again, highest priority first, if the demand still fits with it staying
+        greedy, remaining = [], lacking
+        for i, back in enumerate(releases):
+            greedy.append(i)
+            remaining = tuple(missing - b for missing, b in zip(remaining, back))
+            if all(missing <= 0 for missing in remaining):
+                break
+        for i in reversed(greedy[:-1]):
+            if all(missing + b <= 0 for missing, b in zip(remaining, releases[i])):
+                greedy.remove(i)
+                remaining = tuple(missing + b for missing, b in zip(remaining, releases[i]))
+        best, best_cost = None, cost_to_beat
+        greedy_cost = (sum(candidates[i][0] for i in greedy), len(greedy))
+        if best_cost is None or greedy_cost < best_cost:
+            best, best_cost = greedy, greedy_cost
+        steps = 0
+        
+        def search(i: int, victims: list, total: int, lacking: tuple):
+            nonlocal best, best_cost, steps
+            steps += 1
+            if all(missing <= 0 for missing in lacking):
+                # Adding victims to a set that fits only makes it not minimal
+                if ((total, len(victims)) < best_cost and
+                        all(any(missing + back > 0 for missing, back in zip(lacking, releases[j])) for j in victims)):
+                    best, best_cost = victims, (total, len(victims))
+                return
+            if i == len(candidates) or any(missing > back for missing, back in zip(lacking, rest[i])):
+                return
+            # At least one more victim, and with candidates sorted, none cheaper than candidate i
+            bound = (total + lowest_rest[i] + max(candidates[i][0], 0), len(victims) + 1)
+            if bound >= best_cost or steps > self.VICTIM_SEARCH_STEPS:
+                return
+            search(i + 1, victims + [i], total + candidates[i][0],
+                   tuple(missing - back for missing, back in zip(lacking, releases[i])))
+            search(i + 1, victims, total, lacking)
+        
+        search(0, [], 0, lacking)
+        return None if best is None else [candidates[i][1] for i in best]
+    
+    def _eviction_cost(self, victims):
+        """(total priority, evictions) of a victim set, or None for no set"""
+        if not victims:
+            return None
+        return sum(map(self._victim_priority, victims)), len(victims)
+    
+    def _cheapest_victims(self, priority: int, demand: tuple, heap):
+        """(node, victims) with the lowest eviction cost across the nodes in a victim heap, or (None, ())
+
+        Nodes are evaluated in the order of their lowest priority pod, so with non-negative
+        priorities the search stops as soon as no node left can undercut the best set found:
+        any set on a later node costs at least that node's lowest priority and one eviction.
+        """
+        best, best_cost = (None, ()), None
+        seen = set()
+        for victim_priority, uid in self._victims(heap):
+            if victim_priority >= priority:
+                break
+            if best_cost is not None and victim_priority >= 0 and (victim_priority, 1) >= best_cost:
+                break
+            node_name = self.pod_nodes[uid]
+            if node_name in seen:
+                continue
+            seen.add(node_name)
+            victims = self._node_victims(node_name, priority, demand, best_cost)
+            cost = self._eviction_cost(victims)
+            if cost is not None and (best_cost is None or cost < best_cost):
+                best, best_cost = (node_name, victims), cost
+                if victim_priority >= 0 and best_cost <= (victim_priority, 1):
+                    break  # the usual case, a single lowest priority victim; no need to read on
+        return best
+    
+    @metrics.FIND_AVAILABLE_NODE_DURATION.time()
+    def _find_available_node(self, pod):
+        """Find a node with room for the pod: below max_pods_per_node, matching its node selector
+        and with its requests fitting; the best scoring one unless scoring is policy"""
+        demand = self._pod_demand(pod)
+        if demand is None:
+            return None
+        requests, selector = demand
+        if self.scoring != "policy":
+            return node_scoring.best_node(self.node_resources, self.scoring, requests, selector, self.free_nodes.free)
+        return self.free_nodes.pick(lambda node: self.node_resources.fits(node, requests, selector))
+    
+    @metrics.FIND_PREEMPTIBLE_NODE_DURATION.time()
     def _find_preemptible_node(self, new_pod):
-        """Find a node where we can preempt the lowest priority pod"""
-        new_priority = self._get_pod_priority(new_pod)
+        """Find the node and the set of lower priority pods (smallest total priority, then fewest)
+        whose eviction makes room for new_pod; (None, ()) if there is none"""
+        demand = self._pod_demand(new_pod)
+        if demand is None:
+            return None, ()
+        node_name, victims = self._cheapest_victims(self._get_pod_priority(new_pod), demand, self.victim_heap)
+        if node_name is not None:
+            self.logger.debug("Found %d preemptible pods on node %s: %s", len(victims), node_name,
+                              ", ".join(self.node_pods[node_name][uid][2] for uid in victims))
+        return node_name, victims
+    
+    def _submit_eviction(self, pod, node_name: str, uid: str, entry: tuple):
+        """Evict one victim of pod's preemption; the outcome is delivered to _on_eviction_result"""
+        _, namespace, victim_name, _ = entry
+        if self._eviction_executor is None:
+            self._on_eviction_result(pod, node_name, uid, entry, self.evictor.evict(victim_name, namespace))
+            return
         
-        best_node = None
-        best_pod_to_preempt = None
-        lowest_priority = float('inf')
+        future = self._eviction_executor.submit(self.evictor.evict, victim_name, namespace)
+        future.add_done_callback(lambda f: self._put(
+            (None, 'EVICTION_RESULT', (pod, node_name, uid, entry, f.result() if f.exception() is None else "failed"))))
+    
+    def _on_eviction_result(self, pod, node_name: str, uid: str, entry: tuple, result: str):
+        """Note one victim's eviction; a victim that stays is offered as a victim again"""
+        if result != "evicted":
+            victim = self._cached_pod(uid)
+            if victim is not None and victim.metadata.deletion_timestamp is None:
+                self._set_terminating(uid, False)
+            if result == "blocked":
+                self._blocked_victims[uid] = time.monotonic() + self.BLOCKED_VICTIM_SECONDS
+        nomination = self.nominations.get(pod.metadata.uid)
+        if nomination is None:
+            self._nominator.pop(uid, None)
+            return  # released meanwhile
         
-        # Get all pods scheduled by our scheduler
-        try:
-            all_pods = self.v1.list_pod_for_all_namespaces()
-            
-            for node in self.nodes:
-                # Find pods on this node scheduled by our scheduler
-                node_pods = [pod for pod in all_pods.items 
-                           if (pod.spec.scheduler_name == self.scheduler_name and 
-                               pod.spec.node_name == node)]
-                
-                if not node_pods:
-                    continue
-                    
-                # Find the lowest priority pod on this node that can be preempted
-                for existing_pod in node_pods:
-                    existing_priority = self._get_pod_priority(existing_pod)
-                    if new_priority > existing_priority and existing_priority < lowest_priority:
-                        lowest_priority = existing_priority
-                        best_node = node
-                        best_pod_to_preempt = existing_pod
-                        
-        except ApiException as e:
-            self.logger.error(f"Error finding preemptible pods: {e}")
-            
-        if best_pod_to_preempt:
-            self.logger.info(f"Found lowest priority preemptible pod {best_pod_to_preempt.metadata.name} (priority {lowest_priority}) on node {best_node}")
-            
-        return best_node, best_pod_to_preempt
+        nomination.evicting.discard(uid)
+        victim = self._cached_pod(uid)
+        if result == "evicted" and victim is not None:
+            # Accepted, but the victim is still terminating on the node
+            nomination.terminating.add(uid)
+            grace = self.evictor.grace_period_seconds
+            if grace is None:
+                grace = victim.spec.termination_grace_period_seconds
+            self._extend_reservation(pod.metadata.uid, 30 if grace is None else grace)  # 30: the Kubernetes default
+        else:
+            self._nominator.pop(uid, None)
+            if result != "evicted":
+                nomination.failed.append(entry[2])
+        self._advance_nomination(nomination)
+    
+    def _on_victim_deleted(self, uid: str):
+        """A preemption victim's DELETED event: its node is free for the preemptor once the others are gone too"""
+        nomination = self.nominations.get(self._nominator.get(uid))
+        if nomination is None or uid not in nomination.terminating or self._cached_pod(uid) is not None:
+            return  # eviction outcome still pending (it checks the cache), or only left the pending watch
+        nomination.terminating.discard(uid)
+        del self._nominator[uid]
+        self._advance_nomination(nomination)
+    
+    def _advance_nomination(self, nomination: Nomination):
+        """Bind the preemptor once no victim is left on its node; release it if any victim stayed"""
+        uid = nomination.pod.metadata.uid
+        if nomination.evicting:
+            return
+        if nomination.failed:
+            self._forget_pod(uid, f"failed to preempt {', '.join(nomination.failed)}")
+            self._drop_nomination(uid)  # deleted or expired meanwhile if it was already forgotten
+            return
+        if uid not in self.assumed_pods:
+            self._drop_nomination(uid)  # deleted meanwhile
+            return
+        if nomination.terminating:
+            self.logger.debug("Pod %s waits for %d victims to terminate on node %s", nomination.pod.metadata.name,
+                              len(nomination.terminating), nomination.node_name)
+            return
+        
+        self._drop_nomination(uid)
+        self.logger.debug("Scheduling pod %s to node %s after preemption", nomination.pod.metadata.name, nomination.node_name)
+        self._submit_bind(nomination.pod, nomination.node_name)
+    
+    def _drop_nomination(self, uid: str) -> bool:
+        """Stop tracking a preemptor's nomination; returns whether it had one"""
+        nomination = self.nominations.pop(uid, None)
+        if nomination is None:
+            return False
+        for victim_uid in nomination.evicting | nomination.terminating:
+            self._nominator.pop(victim_uid, None)
+        return True
+    
+    def _extend_reservation(self, uid: str, seconds: float):
+        """Keep an assumed pod's reservation for at least seconds (plus the usual TTL) from now"""
+        assumed = self.assumed_pods.get(uid)
+        if assumed is not None:
+            pod, node_name, deadline = assumed
+            self.assumed_pods[uid] = (pod, node_name, max(deadline, time.monotonic() + seconds + self.ASSUME_TTL_SECONDS))
     
-    def _preempt_pod(self, pod_to_preempt):
-        """Preempt (delete) a lower priority pod"""
+    def _patch_nominated_node(self, pod, node_name) -> bool:
+        """Publish the node reserved for a preemptor as its status.nominatedNodeName (None clears it)"""
         try:
-            pod_name = pod_to_preempt.metadata.name
-            namespace = pod_to_preempt.metadata.namespace
-            node_name = pod_to_preempt.spec.node_name
-            
-            self.logger.info(f"Preempting pod {pod_name} from node {node_name}")
-            
-            # Delete the pod
-            self.v1.delete_namespaced_pod(name=pod_name, namespace=namespace)
-            
-            # Update our tracking
-            if node_name in self.node_pod_count:
-                self.node_pod_count[node_name] = max(0, self.node_pod_count[node_name] - 1)
-                self.logger.info(f"Updated node counts after preemption: {self.node_pod_count}")
-                
+            self.v1.patch_namespaced_pod_status(pod.metadata.name, pod.metadata.namespace,
+                                                {"status": {"nominatedNodeName": node_name}})
             return True
-            
         except ApiException as e:
-            self.logger.error(f"Failed to preempt pod {pod_to_preempt.metadata.name}: {e}")
+            if e.status == 404:
+                return False  # deleted meanwhile
+            self.logger.error("Failed to set nominated node of pod %s: %s", pod.metadata.name, e,
+                              extra={"pod": pod.metadata.name})
+            return False
+        except HTTPError as e:
+            self.logger.error("Failed to set nominated node of pod %s: %s", pod.metadata.name, e,
+                              extra={"pod": pod.metadata.name})
             return False
     
+    def _submit_nomination(self, pod, node_name):
+        """Issue the nominated node patch; nothing waits for its outcome"""
+        if self._bind_executor is None:
+            self._patch_nominated_node(pod, node_name)
+            return
+        self._bind_executor.submit(self._patch_nominated_node, pod, node_name)
+    
     def _bind_pod_to_node(self, pod_name: str, namespace: str, node_name: str) -> bool:
         """Bind a pod to a node"""
-        try:            
-            target_ref = client.V1ObjectReference(
-                kind="Node",
-                name=node_name,
-                api_version="v1"
-            )
-            binding = client.V1Binding(
-                metadata=client.V1ObjectMeta(name=pod_name),
-                target=target_ref
-            )
-            
-            # Try to catch and log the actual API error
-            try:
-                self.v1.create_namespaced_binding(
-                    namespace=namespace,
-                    body=binding
-                )
-            # this is erroring on 'target is None'. but it's not None. any, scheduling is working. ignoring for now - investigate later
-            except Exception as api_error:
-                self.logger.error(f"Ignoring error: {api_error}")
-                return True
+        start = time.perf_counter()
+        try:
+            binder = self.binder
+            if binder is not None:
+                try:
+                    binder.bind(pod_name, namespace, node_name)
+                except (ApiException, HTTPError):
+                    raise
+                except Exception:
+                    # A client version the fast path doesn't handle; the generated client still works
+                    self.logger.exception("Fast bind of pod %s failed, binding through the client from now on",
+                                          pod_name, extra={"pod": pod_name, "node": node_name})
+                    self.binder = None
+                    self._create_binding(pod_name, namespace, node_name)
+            else:
+                self._create_binding(pod_name, namespace, node_name)
             
-            self.logger.info(f"Successfully bound pod {pod_name} to node {node_name}")
+            metrics.BIND_DURATION.labels("success").observe(time.perf_counter() - start)
+            self.logger.info("Successfully bound pod %s to node %s", pod_name, node_name, extra={"pod": pod_name, "node": node_name})
             return True
             
-        except ApiException as e:
-            self.logger.error(f"Failed to bind pod {pod_name} to node {node_name}: {e}")
+        except (ApiException, HTTPError) as e:
+            metrics.BIND_DURATION.labels("error").observe(time.perf_counter() - start)
+            self.logger.error("Failed to bind pod %s to node %s: %s", pod_name, node_name, e,
+                              extra={"pod": pod_name, "node": node_name})
             return False
     
+    def _create_binding(self, pod_name: str, namespace: str, node_name: str):
+        """Bind a pod through the generated client"""
+        target_ref = client.V1ObjectReference(
+            kind="Node",
+            name=node_name,
+            api_version="v1"
+        )
+        binding = client.V1Binding(
+            metadata=client.V1ObjectMeta(name=pod_name),
+            target=target_ref
+        )
+        
+        # The apiserver answers with a Status, which the client fails to deserialize as a
+        # V1Binding ("target must not be None"), so skip deserializing the response, but
+        # read it so the connection goes back to the pool
+        response = self.v1.create_namespaced_binding(
+            namespace=namespace,
+            body=binding,
+            _preload_content=False,
+            _request_timeout=self.BIND_TIMEOUT_SECONDS
+        )
+        response.read()
+        response.release_conn()
+    
+    def _assume_pod(self, pod, node_name: str):
+        """Reserve node_name for the pod in the index before the bind is confirmed"""
+        self._index_pod(pod, node_name)
+        self.assumed_pods[pod.metadata.uid] = (pod, node_name, time.monotonic() + self.ASSUME_TTL_SECONDS)
+    
+    def _submit_bind(self, pod, node_name: str):
+        """Issue the bind for an assumed pod; the outcome is delivered to _on_bind_result"""
+        if self._bind_executor is None:
+            self._on_bind_result(pod, node_name, self._bind_pod_to_node(pod.metadata.name, pod.metadata.namespace, node_name))
+            return
+        
+        future = self._bind_executor.submit(self._bind_pod_to_node, pod.metadata.name, pod.metadata.namespace, node_name)
+        future.add_done_callback(
+            lambda f: self._put((None, 'BIND_RESULT', (pod, node_name, f.exception() is None and f.result()))))
+    
+    def _on_bind_result(self, pod, node_name: str, success: bool):
+        """Keep the reservation on success (the watch confirms it), roll it back on failure"""
+        if success:
+            queued_at = self._queued_at.pop(pod.metadata.uid, None)
+            if queued_at is not None:
+                metrics.E2E_SCHEDULING_DURATION.observe(time.monotonic() - queued_at)
+        else:
+            metrics.BIND_FAILURES.inc()
+            self._forget_pod(pod.metadata.uid, f"bind to {node_name} failed")
+    
+    def _forget_pod(self, uid: str, reason: str):
+        """Roll back an assumed pod's reservation and requeue the pod"""
+        assumed = self.assumed_pods.pop(uid, None)
+        if assumed is None:
+            return
+        pod, node_name, _ = assumed
+        if self.pod_nodes.get(uid) == node_name:
+            self._unindex_pod(uid)
+        if self._drop_nomination(uid):
+            self._submit_nomination(pod, None)
+        self.logger.warning("Released node %s reserved for pod %s: %s", node_name, pod.metadata.name, reason,
+                            extra={"pod": pod.metadata.name, "node": node_name})
+        self._requeue_pod(pod)
+    
+    def _requeue_pod(self, pod):
+        """Retry scheduling the pod after a backoff"""
+        if self._put is None:
+            return  # not running the scheduling loop
+        self.scheduling_queue.add_backoff(pod)
+    
+    def _pop_pending_pod(self):
+        """Pop the highest priority ready pod that still needs scheduling, or None"""
+        while True:
+            pod = self.scheduling_queue.pop()
+            if pod is None:
+                return None
+            uid = pod.metadata.uid
+            current = self._cached_pod(uid)
+            if current is None:
+                continue  # deleted while queued
+            if not (current.spec.node_name or current.metadata.deletion_timestamp or uid in self.assumed_pods
+                    or not self._owns_pod(current)):
+                return current
+    
+    def _schedule_next_pod(self):
+        """Attempt the highest priority ready pod; unplaceable pods are parked"""
+        pod = self._pop_pending_pod()
+        if pod is not None and not self._schedule_pod(pod):
+            self.scheduling_queue.add_unschedulable(pod)
+    
+    def _run_scheduling_cycle(self) -> float:
+        """Housekeeping plus a scheduling decision or batch; returns how long the loop may wait for events"""
+        self._housekeeping()
+        if not self.batch_interval:
+            self._schedule_next_pod()
+            return self.scheduling_queue.wait_time()
+        
+        # Batch mode: let pods accumulate for batch_interval, then place everything that is ready
+        remaining = self._last_batch + self.batch_interval - time.monotonic()
+        if remaining > 0:
+            return remaining
+        pods = []
+        while (pod := self._pop_pending_pod()) is not None:
+            pods.append(pod)
+        if pods:
+            self._schedule_batch(pods)
+            self._last_batch = time.monotonic()
+        return self.scheduling_queue.wait_time()
+    
+    def _housekeeping(self):
+        """Once a second: expire reservations and victim blocks, and retry long-parked pods"""
+        now = time.monotonic()
+        if now < self._next_expiry_check:
+            return
+        self._next_expiry_check = now + 1
+        self._expire_blocked_victims(now)
+        self._expire_assumed_pods(now)
+        self.scheduling_queue.flush_unschedulable()
+    
+    def _expire_blocked_victims(self, now: float):
+        """Offer budget-blocked victims again once their block is over, and retry the pods that needed them"""
+        if not self._blocked_victims:
+            return
+        blocked = {uid: until for uid, until in self._blocked_victims.items() if until > now}
+        if len(blocked) < len(self._blocked_victims):
+            self._blocked_victims = blocked
+            # Nothing else would wake the preemptors parked for lack of victims in a quiet cluster
+            self.scheduling_queue.move_all_to_active()
+    
+    def _expire_assumed_pods(self, now: float):
+        """Roll back reservations whose bind was never confirmed by the watch"""
+        for uid, (pod, node_name, deadline) in list(self.assumed_pods.items()):
+            if deadline > now:
+                continue
+            current = self._cached_pod(uid)
+            if current is not None and current.spec.node_name:
+                # Bound after all; the index follows the cached node
+                del self.assumed_pods[uid]
+                self._index_pod(current, current.spec.node_name)
+            else:
+                self._forget_pod(uid, "bind not confirmed in time")
+    
     def _schedule_pod(self, pod):
-        """Schedule a single pod respecting one-pod-per-node constraint with preemption"""
+        """Schedule a single pod within max_pods_per_node and node resources, with preemption"""
         pod_name = pod.metadata.name
-        namespace = pod.metadata.namespace
         pod_priority = self._get_pod_priority(pod)
         
-        self.logger.info(f"Scheduling pod {pod_name} (priority: {pod_priority})")
+        self.logger.debug("Scheduling pod %s (priority: %d)", pod_name, pod_priority)
+        
+        group = self._pod_group(pod)
+        if group is not None:
+            return self._schedule_gang(group, pod)
         
         # First try to find a node with available capacity
-        node_name = self._find_available_node()
+        node_name = self._find_available_node(pod)
         
         if node_name:
-            self.logger.info(f"Found available node {node_name} for pod {pod_name}")
-            success = self._bind_pod_to_node(pod_name, namespace, node_name)
-            self.logger.info(f"Success: {success}")
-            if success:
-                # Update our tracking (even though binding may fail, pod gets scheduled)
-                self.node_pod_count[node_name] += 1
-                self.logger.info(f"Updated node counts: {self.node_pod_count}")
-            return success
+            self.logger.debug("Found available node %s for pod %s", node_name, pod_name)
+            return self._place_pod(pod, node_name)
         
         # No available nodes, try preemption
-        self.logger.info(f"No available nodes, checking for preemption opportunities for pod {pod_name}")
-        preempt_node, pod_to_preempt = self._find_preemptible_node(pod)
+        self.logger.debug("No available nodes, checking for preemption opportunities for pod %s", pod_name)
+        preempt_node, victims = self._find_preemptible_node(pod)
         
-        if preempt_node and pod_to_preempt:
-            self.logger.info(f"Attempting preemption on node {preempt_node}")
-            
-            # Preempt the lower priority pod
-            if self._preempt_pod(pod_to_preempt):
-                # Now schedule the new pod
-                self.logger.info(f"Scheduling pod {pod_name} to node {preempt_node} after preemption")
-                success = self._bind_pod_to_node(pod_name, namespace, preempt_node)
-                self.logger.info(f"Success: {success}")
-                if success:
-                    # Update our tracking (preemption already decremented, now increment for new pod)
-                    self.node_pod_count[preempt_node] += 1
-                    self.logger.info(f"Updated node counts after preemption scheduling: {self.node_pod_count}")
-                return success
+        # Sharded: another shard with a free node or cheaper victims takes the pod instead
+        if self._try_hand_off(pod, self._eviction_cost(victims)):
+            return True
+        
+        if preempt_node:
+            self.logger.debug("Attempting preemption on node %s", preempt_node)
+            return self._place_pod_with_preemption(pod, preempt_node, victims)
+        else:
+            self.logger.info("No preemption opportunities found for pod %s (priority: %d)", pod_name, pod_priority,
+                             extra={"pod": pod_name})
+            return False
+    
+    def _place_pod(self, pod, node_name: str) -> bool:
+        """Reserve the node right away and bind; the next decision doesn't wait for the bind"""
+        self._assume_pod(pod, node_name)
+        self._submit_bind(pod, node_name)
+        return True
+    
+    def _place_pod_with_preemption(self, pod, node_name: str, victims) -> bool:
+        """Nominate node_name for the pod right away, evict the victims concurrently and bind once they are all gone
+
+        The victims keep their node in the index until they are deleted, so nothing else is placed
+        into the room they are still using.
+        """
+        entries = [(uid, self.node_pods[node_name][uid]) for uid in victims]
+        for uid in victims:
+            self._set_terminating(uid)
+            self._nominator[uid] = pod.metadata.uid
+        self._assume_pod(pod, node_name)
+        self.nominations[pod.metadata.uid] = Nomination(pod, node_name, victims)
+        self._submit_nomination(pod, node_name)
+        for uid, entry in entries:
+            self.logger.info("Preempting pod %s from node %s", entry[2], node_name, extra={"pod": entry[2], "node": node_name})
+            self._submit_eviction(pod, node_name, uid, entry)
+        return True
+    
+    def _schedule_batch(self, pods):
+        """Place a batch of pending pods (highest priority first) in one pass
+
+        Free room goes to the highest priority pods. Each pod that fits nowhere is then paired
+        with the cheapest set of victims still available whose removal makes room for it, so
+        victims are spent on the highest priority pods first.
+        """
+        placed = preempted = handed_off = unschedulable = 0
+        remaining = []
+        groups = set()
+        for pod in pods:
+            # A gang is planned as a whole (free nodes and victims) at its highest priority member
+            group = self._pod_group(pod)
+            if group is not None:
+                key = (group.namespace, group.name)
+                if key not in groups:
+                    groups.add(key)
+                    self._schedule_gang(group)
+                continue
+            node_name = self._find_available_node(pod)
+            if node_name is None:
+                remaining.append(pod)
             else:
-                self.logger.error(f"Failed to preempt pod, cannot schedule {pod_name}")
-                return False
+                self._place_pod(pod, node_name)
+                placed += 1
+        
+        for pod in remaining:
+            preempt_node, victims = self._find_preemptible_node(pod)
+            if self._try_hand_off(pod, self._eviction_cost(victims)):
+                handed_off += 1
+            elif preempt_node and self._place_pod_with_preemption(pod, preempt_node, victims):
+                preempted += 1
+            else:
+                self.scheduling_queue.add_unschedulable(pod)
+                unschedulable += 1
+        
+        self.logger.info("Batch of %d pods: %d placed on free nodes, %d by preemption, %d handed to other shards, "
+                         "%d unschedulable, %d pod groups", len(pods), placed, preempted, handed_off, unschedulable, len(groups))
+    
+    def _pod_group_key(self, pod):
+        """(namespace, group name) from the pod's scheduler.pod-group annotation, or None"""
+        group = (pod.metadata.annotations or {}).get(self.POD_GROUP_ANNOTATION)
+        return (pod.metadata.namespace, group) if group else None
+    
+    def _pod_group(self, pod):
+        """The pod's PodGroup if it is gang scheduled (a min member above 1), else None"""
+        group = self.pod_groups.get(self._pod_group_key(pod))
+        return group if group is not None and group.min_member > 1 else None
+    
+    def _track_pod_group(self, event_type: str, pod):
+        """Keep pod group membership current from one event for a pod of ours"""
+        key = self._pod_group_key(pod)
+        if key is None:
+            return
+        uid = pod.metadata.uid
+        group = self.pod_groups.get(key)
+        if event_type == 'DELETED' or pod.metadata.deletion_timestamp:
+            if group is not None and self._cached_pod(uid) is None:  # not just bound (pending watch mode)
+                group.members.pop(uid, None)
+                if not group.members:
+                    del self.pod_groups[key]
+            return
+        if group is None:
+            group = self.pod_groups[key] = PodGroup(*key)
+        group.members[uid] = pod
+        try:
+            group.min_member = max(1, int(pod.metadata.annotations[self.MIN_MEMBER_ANNOTATION]))
+        except (KeyError, ValueError):
+            pass
+    
+    def _schedule_gang(self, group: PodGroup, popped=None) -> bool:
+        """Place a pod group's pending members all at once, or none of them (the permit stage)
+
+        Placements (free nodes first, else a preemption victim) are planned against the index
+        and undone again; the plan is carried out only if it brings the group up to min_member
+        placed. Otherwise every pending member is parked without having held a node, so a
+        partial gang never sits on nodes waiting for the rest. Returns whether popped (the pod
+        whose attempt this is; the caller parks it on failure) was placed.
+        """
+        pending = []
+        for uid in group.members:
+            current = self._cached_pod(uid)
+            if (uid not in self.pod_nodes and current is not None and not current.spec.node_name
+                    and current.metadata.deletion_timestamp is None and self._owns_pod(current)):
+                pending.append(current)
+        # Once min_member are placed, later members only need to fit themselves
+        needed = max(1, group.min_member - sum(uid in self.pod_nodes for uid in group.members))
+        placed = set()
+        if len(pending) < needed:
+            self.logger.debug("Pod group %s/%s waiting for members: %d pending, %d needed",
+                              group.namespace, group.name, len(pending), needed)
+            plan = []
         else:
-            self.logger.warning(f"No preemption opportunities found for pod {pod_name} (priority: {pod_priority})")
+            plan = self._plan_gang(pending)
+            if len(plan) < needed:
+                self.logger.info("Pod group %s/%s does not fit: room for %d of the %d members needed",
+                                 group.namespace, group.name, len(plan), needed)
+        
+        if plan and len(plan) >= needed:
+            self.logger.info("Placing pod group %s/%s: %d members, %d by preemption",
+                             group.namespace, group.name, len(plan), sum(bool(victims) for _, _, victims in plan))
+            for pod, node_name, victims in plan:
+                self.scheduling_queue.remove(pod.metadata.uid)
+                if not victims:
+                    self._place_pod(pod, node_name)
+                elif not self._place_pod_with_preemption(pod, node_name, victims):
+                    continue
+                placed.add(pod.metadata.uid)
+        
+        for pod in pending:
+            if pod.metadata.uid not in placed and (popped is None or pod.metadata.uid != popped.metadata.uid):
+                self.scheduling_queue.add_unschedulable(pod)
+        return popped is not None and popped.metadata.uid in placed
+    
+    def _plan_gang(self, pods):
+        """[(pod, node, victim uids)] for as many of the pods as fit, highest priority first
+
+        Each placement is made in the index so the next member sees it, then all of them are
+        rolled back in reverse; replaying the plan in order reproduces the same state.
+        """
+        plan = []
+        evicted = []  # (victim uid, node, index entry)
+        for pod in sorted(pods, key=self._get_pod_priority, reverse=True):
+            victims = ()
+            node_name = self._find_available_node(pod)
+            if node_name is None:
+                # Members are planned in priority order, so a victim is never an earlier member
+                node_name, victims = self._find_preemptible_node(pod)
+                if node_name is None:
+                    continue
+                for uid in victims:
+                    evicted.append((uid, node_name, self.node_pods[node_name][uid]))
+                    self._unindex_pod(uid)
+            self._index_pod(pod, node_name)
+            plan.append((pod, node_name, victims))
+        
+        for pod, _, _ in reversed(plan):
+            self._unindex_pod(pod.metadata.uid)
+        for victim_uid, node_name, entry in reversed(evicted):
+            self._index_entry(victim_uid, node_name, entry)
+        return plan
+    
+    def _owns_pod(self, pod) -> bool:
+        """Whether this shard schedules the pod: its shard annotation if handed off, else the hash of
+        its pod group (so a gang is placed by one shard) or of its uid"""
+        if self.shards == 1:
+            return True
+        annotations = pod.metadata.annotations or {}
+        try:
+            return int(annotations[self.SHARD_ANNOTATION]) == self.shard
+        except (KeyError, ValueError):
+            group = self._pod_group_key(pod)
+            return self.shard_ring.owner("/".join(group) if group else pod.metadata.uid) == self.shard
+    
+    def _hand_off_target(self, pod, own_cost: tuple = None):
+        """The shard with the most unpromised free nodes the pod fits on, else the one holding the
+        cheapest victims that make room for it if they cost less than our own (own_cost, see
+        _eviction_cost); None if the pod is best off here"""
+        demand = self._pod_demand(pod)
+        if demand is None:
+            return None
+        requests, selector = demand
+        for target in sorted(self.foreign_free, key=lambda s: len(self.foreign_free[s]) - self._promised[s], reverse=True):
+            if len(self.foreign_free[target]) - self._promised[target] <= 0:
+                break
+            if any(self.node_resources.fits(node, requests, selector) for node in self.foreign_free[target]):
+                return target
+        node_name, victims = self._cheapest_victims(self._get_pod_priority(pod), demand, self.foreign_victim_heap)
+        if node_name is None or (own_cost is not None and own_cost <= self._eviction_cost(victims)):
+            return None
+        return self.node_shard[node_name]
+    
+    def _try_hand_off(self, pod, own_cost: tuple = None) -> bool:
+        """Pass the pod to another shard with a free node or a cheaper victim; True if it was passed on
+        (or set aside for a retry)
+
+        Only the owning shard ever places pods on a node, so handing the pod over (rather than
+        binding it onto another shard's node) keeps the per-node constraints race-free.
+        After shards - 1 consecutive hand-offs a pod backs off where it is before moving again,
+        so pods can't bounce between shards whose free nodes are being taken under them.
+        """
+        if self.shards == 1:
+            return False
+        target = self._hand_off_target(pod, own_cost)
+        if target is None:
+            return False
+        
+        uid = pod.metadata.uid
+        try:
+            hops = int((pod.metadata.annotations or {}).get(self.SHARD_HOPS_ANNOTATION, 0))
+        except ValueError:
+            hops = 0
+        if hops >= self.shards - 1:
+            if not self.scheduling_queue.attempts(uid):
+                self.scheduling_queue.add_backoff(pod)
+                return True
+            hops = 0  # it has waited here once; let it move on again
+        
+        self.logger.info("Handing pod %s off to shard %d", pod.metadata.name, target, extra={"pod": pod.metadata.name})
+        self._set_handed_off(uid, target)
+        self._hand_offs_in_flight.add(uid)
+        self._submit_hand_off(pod, target, hops + 1)
+        return True
+    
+    def _victim_priority(self, uid: str) -> int:
+        return self.node_pods[self.pod_nodes[uid]][uid][0]
+    
+    def _set_handed_off(self, uid: str, shard):
+        """Track (or with None, stop tracking) a pending pod we passed to another shard"""
+        previous = self._handed_off.pop(uid, None)
+        if previous is not None:
+            self._promised[previous] -= 1
+        if shard is not None:
+            self._handed_off[uid] = shard
+            self._promised[shard] += 1
+    
+    def _patch_pod_shard(self, pod, shard: int, hops: int) -> bool:
+        """Move the pod to another shard through its annotations"""
+        try:
+            self.v1.patch_namespaced_pod(pod.metadata.name, pod.metadata.namespace, {"metadata": {"annotations": {
+                self.SHARD_ANNOTATION: str(shard), self.SHARD_HOPS_ANNOTATION: str(hops)}}})
+            metrics.SHARD_HANDOFFS.inc()
+            return True
+        except (ApiException, HTTPError) as e:
+            self.logger.error("Failed to hand pod %s off to shard %d: %s", pod.metadata.name, shard, e)
             return False
     
+    def _submit_hand_off(self, pod, shard: int, hops: int):
+        """Issue the hand-off patch; the outcome is delivered to _on_hand_off_result"""
+        if self._bind_executor is None:
+            self._on_hand_off_result(pod, self._patch_pod_shard(pod, shard, hops))
+            return
+        
+        future = self._bind_executor.submit(self._patch_pod_shard, pod, shard, hops)
+        future.add_done_callback(
+            lambda f: self._put((None, 'HANDOFF_RESULT', (pod, f.exception() is None and f.result()))))
+    
+    def _on_hand_off_result(self, pod, success: bool):
+        """The new shard picks the pod up from its watch; on failure it stays with us"""
+        self._hand_offs_in_flight.discard(pod.metadata.uid)
+        if not success:
+            self._set_handed_off(pod.metadata.uid, None)
+            self._requeue_pod(pod)
+    
+    def _handle_pod_event(self, event_type: str, pod, cache=None):
+        """Update tracking from one pod watch event and queue new pending pods"""
+        pod_name = pod.metadata.name
+        
+        if pod.spec.scheduler_name != self.scheduler_name:
+            self._account_other_pod(event_type, pod)
+            return
+        self._track_pod_group(event_type, pod)
+        self.logger.debug("Event %s for pod %s, node=%s", event_type, pod_name, pod.spec.node_name)
+        if event_type == 'DELETED' and pod.metadata.uid in self._nominator:
+            self._on_victim_deleted(pod.metadata.uid)
+        
+        # Only handle pods assigned to our scheduler that aren't scheduled yet (when sharded, a
+        # MODIFIED event can move a pending pod between shards)
+        if (pod.spec.scheduler_name == self.scheduler_name and 
+            pod.spec.node_name is None and
+            (event_type == 'ADDED' or (self.shards > 1 and event_type == 'MODIFIED'))):
+            
+            uid = pod.metadata.uid
+            if uid in self.assumed_pods:
+                return  # already reserved, bind in flight
+            if not self._owns_pod(pod):
+                self.scheduling_queue.remove(uid)
+                if uid in self._handed_off:
+                    self._set_handed_off(uid, int(pod.metadata.annotations[self.SHARD_ANNOTATION]))
+                return
+            if uid in self._hand_offs_in_flight or (event_type == 'MODIFIED' and uid in self.scheduling_queue):
+                return  # hand-off in flight, or already queued
+            self._set_handed_off(uid, None)  # handed back to us
+            self.logger.debug("New pod to schedule: %s", pod_name)
+            self._queue_pod(pod)
+        elif cache is not None and cache is self.pending_cache:
+            # Bound pods drop out of the pending watch as DELETED; the bound watch tracks them
+            if event_type == 'DELETED':
+                self.scheduling_queue.remove(pod.metadata.uid)
+                self._set_handed_off(pod.metadata.uid, None)
+                if pod.metadata.uid not in self.assumed_pods:
+                    self._queued_at.pop(pod.metadata.uid, None)
+        elif pod.spec.scheduler_name == self.scheduler_name and event_type == 'DELETED' and pod.spec.node_name:
+            # Update our tracking when pods are deleted (a terminating pod holds its node until then)
+            self.assumed_pods.pop(pod.metadata.uid, None)
+            self._queued_at.pop(pod.metadata.uid, None)
+            self._set_handed_off(pod.metadata.uid, None)
+            self._terminating.discard(pod.metadata.uid)
+            if self._unindex_pod(pod.metadata.uid):
+                self.logger.debug("Pod %s deleted from node %s; %d nodes free", pod_name, pod.spec.node_name, len(self.free_nodes))
+                self.scheduling_queue.move_all_to_active()
+        elif pod.spec.scheduler_name == self.scheduler_name and pod.spec.node_name:
+            # Bound pods keep the node index current (re-indexing the same uid is a no-op) and
+            # confirm any reservation we made for them
+            self.assumed_pods.pop(pod.metadata.uid, None)
+            self.scheduling_queue.remove(pod.metadata.uid)
+            self._set_handed_off(pod.metadata.uid, None)
+            if pod.metadata.deletion_timestamp is not None:
+                self._set_terminating(pod.metadata.uid)
+            self._index_pod(pod, pod.spec.node_name)
+        elif pod.spec.scheduler_name == self.scheduler_name and event_type == 'DELETED':
+            # Deleted before it was scheduled
+            self.scheduling_queue.remove(pod.metadata.uid)
+            self._queued_at.pop(pod.metadata.uid, None)
+            self._set_handed_off(pod.metadata.uid, None)
+        elif pod.spec.scheduler_name == self.scheduler_name:
+            self.logger.debug("Skipped pod %s - event_type=%s, node_name=%s", pod_name, event_type, pod.spec.node_name)
+    
+    def _watch_into(self, cache: Informer, put):
+        """Thread target: forward one informer's events to the scheduling loop via put()"""
+        try:
+            for event_type, pod in cache.watch():
+                put((cache, event_type, pod))
+        except Exception as e:
+            put((cache, 'ERROR', e))
+    
+    def _start_watches(self, put):
+        """Start one watch thread per informer, each resuming from its cache's resourceVersion"""
+        for cache in [self.node_cache, *self.pod_caches]:
+            threading.Thread(target=self._watch_into, args=(cache, put), daemon=True).start()
+    
+    def _queue_cached_pending_pods(self):
+        """Queue pods that were already pending when the caches were listed (the watch won't replay them)"""
+        for pod in list(self._cached_pods()):
+            if pod.spec.node_name is None and pod.metadata.deletion_timestamp is None and self._owns_pod(pod):
+                self.logger.debug("Pending pod to schedule: %s", pod.metadata.name)
+                self._queue_pod(pod)
+        self.logger.info("Queued %d pending pods", len(self.scheduling_queue))
+    
+    def _queue_pod(self, pod):
+        """Queue a pending pod, remembering when it first arrived"""
+        self._queued_at.setdefault(pod.metadata.uid, time.monotonic())
+        self.scheduling_queue.add(pod)
+    
+    def _start_metrics_server(self):
+        """Serve Prometheus metrics if a port is configured"""
+        if self.metrics_port:
+            metrics.start_metrics_server(self, self.metrics_port)
+            self.logger.info("Serving metrics on port %d", self.metrics_port)
+    
+    def _start_leader_election(self):
+        """Campaign for the scheduler's Lease; leadership changes arrive on the scheduling loop queue"""
+        metrics.IS_LEADER.set(int(self._leading))
+        if not self.leader_elect:
+            return
+        # Sharded replicas each elect a leader for their own shard
+        lease_name = self.scheduler_name if self.shards == 1 else f"{self.scheduler_name}-shard-{self.shard}"
+        self.elector = LeaderElector(
+            client.CoordinationV1Api(self.v1.api_client), lease_name, self.lease_namespace,
+            self.identity, self.logger, on_change=lambda leading: self._put((None, 'LEADERSHIP', leading))).start()
+        self.logger.info("Standing by for lease %s/%s as %s", self.lease_namespace, lease_name, self.identity)
+    
+    def _stop_leader_election(self):
+        """Step down and release the lease so a standby takes over immediately"""
+        if self.elector is not None:
+            self.elector.stop()
+    
+    def _on_leadership_change(self, leading: bool):
+        """Start or stop making scheduling decisions"""
+        if leading == self._leading:
+            return
+        self._leading = leading
+        metrics.IS_LEADER.set(int(leading))
+        if leading:
+            # The informers and node index are already current, so scheduling resumes right away
+            self.logger.info("Became leader with %d pending pods, %d free nodes", len(self.scheduling_queue), len(self.free_nodes))
+            self.scheduling_queue.move_all_to_active()
+            self._next_expiry_check = 0
+        else:
+            self.logger.warning("Lost leadership, no longer scheduling")
+    
+    def _dispatch(self, cache, event_type: str, obj):
+        """Handle one item from the scheduling loop queue"""
+        if event_type == 'ERROR':
+            raise obj
+        elif event_type == 'BIND_RESULT':
+            self._on_bind_result(*obj)
+        elif event_type == 'EVICTION_RESULT':
+            self._on_eviction_result(*obj)
+        elif event_type == 'HANDOFF_RESULT':
+            self._on_hand_off_result(*obj)
+        elif event_type == 'LEADERSHIP':
+            self._on_leadership_change(obj)
+        elif cache is self.node_cache:
+            self._handle_node_event(event_type, obj)
+        else:
+            self._handle_pod_event(event_type, obj, cache)
+    
     def run(self):
         """Main scheduler loop"""
-        self.logger.info(f"Starting custom scheduler: {self.scheduler_name} - VERSION 3.1 with constraint tracking and priorities")
-        self.logger.info(f"Available nodes: {self.nodes}")
+        self.logger.info("Starting custom scheduler: %s - VERSION 3.1 with constraint tracking and priorities", self.scheduler_name)
+        self.logger.info("%d available nodes", len(self.free_nodes))
         
-        # Watch for new pods that need scheduling
-        w = watch.Watch()
+        # All scheduling state is only touched from this thread; watches and binds report back through the queue
+        events = queue.Queue()
+        self._put = events.put
+        self._bind_executor = ThreadPoolExecutor(max_workers=self.BIND_WORKERS, thread_name_prefix="scheduler-bind")
+        self._eviction_executor = ThreadPoolExecutor(max_workers=self.EVICTION_WORKERS, thread_name_prefix="scheduler-evict")
+        self._start_metrics_server()
         
-        for event in w.stream(self.v1.list_pod_for_all_namespaces):
-            event_type = event['type']
-            pod = event['object']
-            pod_name = pod.metadata.name
-            
-            # Debug: Log all events for our scheduler
-            if pod.spec.scheduler_name == self.scheduler_name:
-                self.logger.info(f"DEBUG: Event {event_type} for pod {pod_name}, scheduler={pod.spec.scheduler_name}, node={pod.spec.node_name}")
-            
-            # Only handle pods assigned to our scheduler that aren't scheduled yet
-            if (pod.spec.scheduler_name == self.scheduler_name and 
-                pod.spec.node_name is None and
-                event_type == 'ADDED'):
-                
-                self.logger.info(f"New pod to schedule: {pod_name}")
-                self._schedule_pod(pod)
-            elif (pod.spec.scheduler_name == self.scheduler_name and 
-                  event_type == 'DELETED' and 
-                  pod.spec.node_name):
-                # Update our tracking when pods are deleted
-                self.node_pod_count[pod.spec.node_name] = max(0, self.node_pod_count[pod.spec.node_name] - 1)
-                self.logger.info(f"Pod {pod_name} deleted from node {pod.spec.node_name}, updated counts: {self.node_pod_count}")
-            elif pod.spec.scheduler_name == self.scheduler_name:
-                self.logger.info(f"DEBUG: Skipped pod {pod_name} - event_type={event_type}, node_name={pod.spec.node_name}")
+        self._queue_cached_pending_pods()
+        self._start_watches(events.put)
+        self._start_leader_election()
+        
+        # Take in every event that has arrived before each decision, so the queue orders a burst by
+        # priority; only block when there is nothing ready to schedule. A standby only applies events.
+        timeout = 0
+        try:
+            while True:
+                try:
+                    self._dispatch(*events.get(timeout=timeout))
+                    while True:
+                        self._dispatch(*events.get_nowait())
+                except queue.Empty:
+                    pass
+                timeout = self._run_scheduling_cycle() if self._leading else None
+        finally:
+            self._stop_leader_election()
+
+
+def _shard_from_env(shards: int) -> int:
+    """SCHEDULER_SHARD, else the StatefulSet ordinal at the end of POD_NAME"""
+    if "SCHEDULER_SHARD" in os.environ:
+        return int(os.environ["SCHEDULER_SHARD"])
+    ordinal = os.environ.get("POD_NAME", "").rsplit("-", 1)[-1]
+    return int(ordinal) % shards if ordinal.isdigit() else 0
+
+
+def scheduler_options_from_env() -> dict:
+    """CustomScheduler keyword arguments from SCHEDULER_* environment variables"""
+    shards = int(os.environ.get("SCHEDULER_SHARDS", "1"))
+    return {
+        "node_policy": os.environ.get("SCHEDULER_NODE_POLICY", "first"),
+        "watch_mode": os.environ.get("SCHEDULER_WATCH_MODE", "all"),
+        "batch_interval": float(os.environ.get("SCHEDULER_BATCH_INTERVAL_MS", "0")) / 1000,
+        "metrics_port": int(os.environ.get("SCHEDULER_METRICS_PORT", "8080")),
+        "log_level": os.environ.get("SCHEDULER_LOG_LEVEL", "INFO"),
+        "log_format": os.environ.get("SCHEDULER_LOG_FORMAT", "text"),
+        "debug_sample": int(os.environ.get("SCHEDULER_LOG_DEBUG_SAMPLE", "1")),
+        "max_pods_per_node": int(os.environ.get("SCHEDULER_MAX_PODS_PER_NODE", "1")),
+        "scoring": os.environ.get("SCHEDULER_SCORING", "policy"),
+        "eviction_grace_period": int(os.environ["SCHEDULER_EVICTION_GRACE_SECONDS"]) if os.environ.get("SCHEDULER_EVICTION_GRACE_SECONDS") else None,
+        "eviction_timeout": float(os.environ.get("SCHEDULER_EVICTION_TIMEOUT_SECONDS", "30")),
+        "fast_bind": os.environ.get("SCHEDULER_FAST_BIND", "true").lower() in ("1", "true", "yes"),
+        "leader_elect": os.environ.get("SCHEDULER_LEADER_ELECT", "false").lower() in ("1", "true", "yes"),
+        "lease_namespace": os.environ.get("SCHEDULER_LEASE_NAMESPACE") or os.environ.get("POD_NAMESPACE", "scheduling"),
+        "shards": shards,
+        "shard": _shard_from_env(shards),
+    }
 
 
 if __name__ == "__main__":
-    scheduler = CustomScheduler()
-    scheduler.run()
\ No newline at end of file
+    # Exit through run()'s cleanup on SIGTERM so a leader hands its lease over immediately
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    scheduler = CustomScheduler(**scheduler_options_from_env())
+    scheduler.run()
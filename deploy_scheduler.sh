@@ -80,10 +80,15 @@ echo ""
 
 # Verify the scheduler is running
 echo "Verifying scheduler status..."
-SCHEDULER_POD=$(kubectl get pods -n $NAMESPACE -l app=custom-scheduler -o jsonpath='{.items[0].metadata.name}')
+# With leader election the lease holder is the replica doing the scheduling
+sleep 2
+SCHEDULER_POD=$(kubectl get lease $SCHEDULER_NAME -n $NAMESPACE -o jsonpath='{.spec.holderIdentity}' 2>/dev/null)
+if [ -z "$SCHEDULER_POD" ]; then
+    SCHEDULER_POD=$(kubectl get pods -n $NAMESPACE -l app=custom-scheduler -o jsonpath='{.items[0].metadata.name}')
+fi
 
 if [ -n "$SCHEDULER_POD" ]; then
-    echo "Scheduler pod: $SCHEDULER_POD"
+    echo "Scheduler pod (leader): $SCHEDULER_POD"
     kubectl get pod $SCHEDULER_POD -n $NAMESPACE
     echo ""
     
@@ -0,0 +1,86 @@
+import time
+import logging
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError
+
+import scheduler_metrics as metrics
+
+
+class Evictor:
+    """Evicts preemption victims through the policy/v1 Eviction subresource
+
+    Unlike a plain DELETE, an eviction is refused with 429 while it would violate a
+    PodDisruptionBudget; such a refusal is retried with exponential backoff until
+    retry_timeout has passed since the first attempt, since budgets usually free up as
+    other pods become ready. A victim that is already gone (404) counts as evicted.
+
+    evict() blocks its thread through the retries and suits a thread pool; an event loop
+    can drive attempt(), retry_delay() and finish() itself to sleep without holding a thread.
+    """
+
+    INITIAL_BACKOFF_SECONDS = 0.5
+    MAX_BACKOFF_SECONDS = 5
+
+    def __init__(self, core_api, logger: logging.Logger, grace_period_seconds: int = None, retry_timeout: float = 30):
+        self.api = core_api
+        self.logger = logger
+        self.grace_period_seconds = grace_period_seconds  # None leaves each pod's terminationGracePeriodSeconds
+        self.retry_timeout = retry_timeout
+
+    def evict(self, name: str, namespace: str) -> str:
+        """Evict a pod, retrying while a budget blocks it; returns "evicted", "blocked" or "failed\""""
+        started = time.monotonic()
+        retries = 0
+        while True:
+            result = self.attempt(name, namespace)
+            delay = self.retry_delay(result, started, retries)
+            if delay is None:
+                return self.finish(name, namespace, result, started, retries)
+            time.sleep(delay)
+            retries += 1
+
+    def attempt(self, name: str, namespace: str) -> str:
+        """One eviction request: "evicted", "blocked" (429, a disruption budget) or "failed\""""
+        body = client.V1Eviction(
+            metadata=client.V1ObjectMeta(name=name, namespace=namespace),
+            delete_options=client.V1DeleteOptions(grace_period_seconds=self.grace_period_seconds))
+        try:
+            # The apiserver answers with a Status rather than the Eviction; skip deserializing it, but
+            # read it so the connection goes back to the pool
+            response = self.api.create_namespaced_pod_eviction(name, namespace, body, _preload_content=False)
+            response.read()
+            response.release_conn()
+            return "evicted"
+        except ApiException as e:
+            if e.status == 404:
+                return "evicted"
+            if e.status == 429:
+                return "blocked"
+            self.logger.error("Failed to evict pod %s: %s", name, e, extra={"pod": name})
+            return "failed"
+        except HTTPError as e:
+            self.logger.error("Failed to evict pod %s: %s", name, e, extra={"pod": name})
+            return "failed"
+
+    def retry_delay(self, result: str, started: float, retries: int):
+        """Seconds to wait before retrying a blocked eviction, or None to stop"""
+        if result != "blocked":
+            return None
+        delay = min(self.INITIAL_BACKOFF_SECONDS * 2 ** retries, self.MAX_BACKOFF_SECONDS)
+        if time.monotonic() + delay > started + self.retry_timeout:
+            return None
+        return delay
+
+    def finish(self, name: str, namespace: str, result: str, started: float, retries: int) -> str:
+        """Record the outcome of an eviction that began at started (monotonic); returns result"""
+        elapsed = time.monotonic() - started
+        metrics.EVICTION_DURATION.labels(result).observe(elapsed)
+        if result == "evicted":
+            metrics.PREEMPTIONS.inc()
+            self.logger.info("Evicted pod %s/%s in %.1fms (%d retries)", namespace, name, elapsed * 1000, retries,
+                             extra={"pod": name})
+        elif result == "blocked":
+            self.logger.warning("Eviction of pod %s/%s still blocked by a disruption budget after %.1fs, giving up",
+                                namespace, name, elapsed, extra={"pod": name})
+        return result
@@ -0,0 +1,73 @@
+"""Fast pod binds: pre-serialized Binding bodies over a dedicated keep-alive connection pool
+
+create_namespaced_binding builds V1Binding, V1ObjectMeta and V1ObjectReference models for
+every bind, turns them back into dicts, JSON-encodes them and validates the parameters, then
+sends the request through the client's shared connection pool, which the long-running watches
+also hold connections from; once that pool is full, extra connections are opened per request
+and closed afterwards. FastBinder fills a byte template instead (each node's target is
+serialized once) and posts it through its own pool, sized for the concurrent binds, so every
+bind reuses a warm connection. TLS, client certificates, proxies and bearer tokens (including
+refreshed in-cluster tokens) come from the same configuration as the regular client; the
+request headers are rebuilt every few seconds rather than per bind, since asking the
+configuration for the token runs its refresh hook, which for kubeconfig credentials reloads
+the whole configuration (about 1ms).
+"""
+
+import copy
+import json
+import time
+from urllib.parse import quote
+
+from kubernetes.client import rest
+from kubernetes.client.rest import ApiException
+
+
+class FastBinder:
+    """Posts pods/binding requests without building client models"""
+
+    HEADERS_TTL_SECONDS = 10
+
+    def __init__(self, api_client, pool_size: int, timeout: float):
+        self.api_client = api_client  # for the host, default headers and current credentials
+        self.timeout = timeout
+        configuration = copy.deepcopy(api_client.configuration)
+        configuration.connection_pool_maxsize = pool_size
+        configuration.keep_alive = True  # TCP keepalives, so idle pooled connections aren't silently dropped
+        self.rest = rest.RESTClientObject(configuration)
+        self._targets = {}  # node name -> serialized target reference
+        self._headers = None
+        self._headers_expire = 0
+
+    def _target(self, node_name: str) -> bytes:
+        target = self._targets.get(node_name)
+        if target is None:
+            target = json.dumps({"apiVersion": "v1", "kind": "Node", "name": node_name}, separators=(",", ":")).encode()
+            self._targets[node_name] = target
+        return target
+
+    def _request_headers(self) -> dict:
+        """Default, content and auth headers, shared by binds until they expire"""
+        now = time.monotonic()
+        if self._headers is None or now >= self._headers_expire:
+            headers = {**self.api_client.default_headers, "User-Agent": self.api_client.user_agent,
+                       "Content-Type": "application/json", "Accept": "application/json"}
+            # auth_settings() refreshes the token and has kept its shape across client versions,
+            # unlike update_params_for_auth()'s signature
+            auth = self.api_client.configuration.auth_settings().get("BearerToken")
+            if auth and auth.get("value"):
+                headers[auth["key"]] = auth["value"]
+            self._headers, self._headers_expire = headers, now + self.HEADERS_TTL_SECONDS
+        return self._headers
+
+    def bind(self, pod_name: str, namespace: str, node_name: str):
+        """Bind a pod to a node; raises ApiException on an error status, like the generated client"""
+        body = b'{"apiVersion":"v1","kind":"Binding","metadata":{"name":%s},"target":%s}' % (
+            json.dumps(pod_name).encode(), self._target(node_name))
+        path = f"/api/v1/namespaces/{quote(namespace, safe='')}/pods/{quote(pod_name, safe='')}/binding"
+        # The apiserver answers with a Status; it is read so the connection goes back to the pool, never parsed
+        response = self.rest.pool_manager.request("POST", self.api_client.configuration.host + path, body=body,
+                                                  headers=self._request_headers(), timeout=self.timeout)
+        if not 200 <= response.status <= 299:
+            if response.status == 401:
+                self._headers = None  # the token may have rotated
+            raise ApiException(http_resp=response)
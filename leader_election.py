@@ -0,0 +1,168 @@
+import copy
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from kubernetes import client
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import HTTPError
+
+
+class LeaderElector:
+    """Lease-based leader election (coordination.k8s.io/v1), following client-go's leaderelection
+
+    Every replica runs one of these on a background thread. The holder renews the Lease every
+    retry_period; a replica that has not managed to renew for renew_deadline steps down before
+    the lease (lease_duration) can expire, so two replicas never both believe they lead.
+    Standbys poll every retry_period and take over once the holder's renewals have stopped for
+    a full lease_duration, or immediately after a holder releases the lease on shutdown.
+
+    Expiry is judged from when this replica last saw the lease record change, not from the
+    timestamps in it, so clock skew between replicas doesn't matter.
+
+    Every lease call has a timeout, and the holder's calls end by its renew deadline, so a hung
+    apiserver connection can't keep it leading past the point where it must step down.
+    """
+
+    def __init__(self, coordination_api, name: str, namespace: str, identity: str, logger: logging.Logger,
+                 on_change=None, lease_duration: float = 10, renew_deadline: float = 7, retry_period: float = 0.5):
+        if not retry_period < renew_deadline < lease_duration:
+            raise ValueError("Leader election needs retry_period < renew_deadline < lease_duration")
+        # urllib3 retries a timed-out read up to three times, which would stretch a lease call far
+        # past its timeout; the election loop retries a failed round itself
+        configuration = copy.deepcopy(coordination_api.api_client.configuration)
+        configuration.retries = False
+        self.api = client.CoordinationV1Api(client.ApiClient(configuration))
+        self.name = name
+        self.namespace = namespace
+        self.identity = identity
+        self.logger = logger
+        self.on_change = on_change  # called with True/False from the election thread on every transition
+        self.lease_duration = lease_duration
+        self.renew_deadline = renew_deadline
+        self.retry_period = retry_period
+        self.request_timeout = (renew_deadline - retry_period) / 2  # per call; a round is a read and a write
+        self._leading = threading.Event()
+        self._stopped = threading.Event()
+        self._observed_record = None  # (holder, renew time) last seen on the lease
+        self._observed_at = 0  # monotonic time _observed_record was first seen
+        self._last_renew = 0
+        self._thread = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leading.is_set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop campaigning and hand the lease over right away if we hold it"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.retry_period + 5)
+        if self.is_leader:
+            self._set_leading(False)
+            self._release()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            started = time.monotonic()  # the renew time we write is from before the round
+            if self._try_acquire_or_renew():
+                self._last_renew = started
+                if not self.is_leader:
+                    self.logger.info("Acquired lease %s/%s as %s", self.namespace, self.name, self.identity)
+                    self._set_leading(True)
+            elif self.is_leader and time.monotonic() - self._last_renew >= self.renew_deadline:
+                self.logger.warning("Failed to renew lease %s/%s for %.1fs, stepping down",
+                                    self.namespace, self.name, time.monotonic() - self._last_renew)
+                self._set_leading(False)
+            self._stopped.wait(self.retry_period)
+
+    def _call_timeout(self) -> float:
+        """Timeout for one lease call; the holder's calls end by its renew deadline"""
+        if not self.is_leader:
+            return self.request_timeout
+        remaining = self._last_renew + self.renew_deadline - time.monotonic()
+        return max(min(self.request_timeout, remaining), 0.1)
+
+    def _set_leading(self, leading: bool):
+        if leading:
+            self._leading.set()
+        else:
+            self._leading.clear()
+        if self.on_change is not None:
+            self.on_change(leading)
+
+    def _try_acquire_or_renew(self) -> bool:
+        """One election round; returns True if we hold the lease afterwards"""
+        now = datetime.now(timezone.utc)
+        try:
+            lease = self.api.read_namespaced_lease(self.name, self.namespace, _request_timeout=self._call_timeout())
+        except ApiException as e:
+            if e.status != 404:
+                self.logger.error("Error reading lease %s/%s: %s", self.namespace, self.name, e)
+                return False
+            return self._create(now)
+        except HTTPError as e:
+            self.logger.error("Error reading lease %s/%s: %s", self.namespace, self.name, e)
+            return False
+
+        spec = lease.spec or client.V1LeaseSpec()
+        record = (spec.holder_identity, spec.renew_time)
+        if record != self._observed_record:
+            self._observed_record = record
+            self._observed_at = time.monotonic()
+        holder = spec.holder_identity
+        duration = spec.lease_duration_seconds or self.lease_duration
+        if holder and holder != self.identity and time.monotonic() < self._observed_at + duration:
+            return False  # held by someone else and not expired
+
+        if holder != self.identity:
+            spec.acquire_time = now
+            spec.lease_transitions = (spec.lease_transitions or 0) + 1
+        spec.holder_identity = self.identity
+        spec.lease_duration_seconds = int(self.lease_duration)
+        spec.renew_time = now
+        lease.spec = spec
+        try:
+            # metadata.resourceVersion makes this a compare-and-swap: a concurrent winner gets us a 409
+            self.api.replace_namespaced_lease(self.name, self.namespace, lease, _request_timeout=self._call_timeout())
+        except (ApiException, HTTPError) as e:
+            if getattr(e, "status", None) != 409:
+                self.logger.error("Error updating lease %s/%s: %s", self.namespace, self.name, e)
+            return False
+        self._observed_record = (self.identity, now)
+        self._observed_at = time.monotonic()
+        return True
+
+    def _create(self, now: datetime) -> bool:
+        lease = client.V1Lease(
+            metadata=client.V1ObjectMeta(name=self.name, namespace=self.namespace),
+            spec=client.V1LeaseSpec(holder_identity=self.identity, lease_duration_seconds=int(self.lease_duration),
+                                    acquire_time=now, renew_time=now, lease_transitions=0))
+        try:
+            self.api.create_namespaced_lease(self.namespace, lease, _request_timeout=self._call_timeout())
+        except (ApiException, HTTPError) as e:
+            if getattr(e, "status", None) != 409:
+                self.logger.error("Error creating lease %s/%s: %s", self.namespace, self.name, e)
+            return False
+        self._observed_record = (self.identity, now)
+        self._observed_at = time.monotonic()
+        return True
+
+    def _release(self):
+        """Clear the holder so a standby can take over without waiting for the lease to expire"""
+        try:
+            lease = self.api.read_namespaced_lease(self.name, self.namespace, _request_timeout=self.request_timeout)
+            if lease.spec is None or lease.spec.holder_identity != self.identity:
+                return
+            lease.spec.holder_identity = None
+            lease.spec.lease_duration_seconds = 1
+            lease.spec.renew_time = datetime.now(timezone.utc)
+            self.api.replace_namespaced_lease(self.name, self.namespace, lease, _request_timeout=self.request_timeout)
+            self.logger.info("Released lease %s/%s", self.namespace, self.name)
+        except (ApiException, HTTPError) as e:
+            self.logger.warning("Error releasing lease %s/%s: %s", self.namespace, self.name, e)
@@ -0,0 +1,77 @@
+"""Node scoring: choose the best node a pod fits on under a scoring strategy
+
+Strategies score a node by how its CPU and memory would be allocated with the pod on it:
+  least-allocated - most room left (spreads pods out)
+  most-allocated  - least room left (packs pods onto as few nodes as possible)
+  balanced        - CPU and memory allocated in the closest proportion
+
+With NumPy installed, the filter (room for another pod, resources, node selector) and the
+score are computed for every node in one vectorized pass over NodeResources' arrays, which
+NumPy reads in place. Without it the same filter and score run in a Python loop over the
+free nodes. Ties go to the node seen first either way.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # optional: scoring falls back to a Python loop
+    np = None
+
+STRATEGIES = ("least-allocated", "most-allocated", "balanced")
+CPU, MEMORY = 0, 1  # NodeResources columns
+
+
+def _score(strategy: str, cpu, memory):
+    """Score from allocated fractions; works on floats and on arrays alike"""
+    if strategy == "least-allocated":
+        return 1 - (cpu + memory) / 2
+    if strategy == "most-allocated":
+        return (cpu + memory) / 2
+    return 1 - abs(cpu - memory)
+
+
+def best_node(resources, strategy: str, requests: tuple, selector: tuple, candidates):
+    """The highest scoring node among candidates (our free pool) that the pod fits on, or None"""
+    if np is not None:
+        return _best_node_vectorized(resources, strategy, requests, selector)
+    return _best_node_loop(resources, strategy, requests, selector, candidates)
+
+
+def _best_node_vectorized(resources, strategy: str, requests: tuple, selector: tuple):
+    if not resources.names:
+        return None
+    mask = np.frombuffer(resources.eligible, dtype=np.int8) != 0
+    for column, amount in requests:
+        free = np.frombuffer(resources.allocatable[column], dtype=np.int64) - np.frombuffer(resources.requested[column], dtype=np.int64)
+        mask &= free >= amount
+    for word, bits in selector:
+        bits = np.uint64(bits)
+        mask &= (np.frombuffer(resources.labels[word], dtype=np.uint64) & bits) == bits
+    if not mask.any():
+        return None
+
+    request = dict(requests)
+    fractions = []
+    for column in (CPU, MEMORY):
+        allocatable = np.frombuffer(resources.allocatable[column], dtype=np.int64)
+        allocated = np.frombuffer(resources.requested[column], dtype=np.int64) + request.get(column, 0)
+        fractions.append(np.divide(allocated, allocatable, out=np.zeros(len(mask)), where=allocatable > 0))
+    scores = np.where(mask, _score(strategy, *fractions), -np.inf)
+    return resources.names[int(np.argmax(scores))]
+
+
+def _best_node_loop(resources, strategy: str, requests: tuple, selector: tuple, candidates):
+    request = dict(requests)
+    best, best_key = None, None
+    for node in candidates:
+        if not resources.fits(node, requests, selector):
+            continue
+        row = resources.rows[node]
+        fractions = []
+        for column in (CPU, MEMORY):
+            allocatable = resources.allocatable[column][row]
+            allocated = resources.requested[column][row] + request.get(column, 0)
+            fractions.append(allocated / allocatable if allocatable > 0 else 0.0)
+        key = (_score(strategy, *fractions), -row)
+        if best_key is None or key > best_key:
+            best, best_key = node, key
+    return best
@@ -0,0 +1,67 @@
+"""Prometheus metrics for the custom scheduler, served by start_metrics_server()"""
+
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+
+# Decisions are in-memory lookups (microseconds); API round-trips and end-to-end latency are milliseconds to seconds
+DECISION_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+E2E_SCHEDULING_DURATION = Histogram(
+    "scheduler_e2e_scheduling_duration_seconds",
+    "Time from a pod entering the scheduling queue to its successful bind",
+    buckets=LATENCY_BUCKETS)
+FIND_AVAILABLE_NODE_DURATION = Histogram(
+    "scheduler_find_available_node_duration_seconds",
+    "Time spent looking for a free node",
+    buckets=DECISION_BUCKETS)
+FIND_PREEMPTIBLE_NODE_DURATION = Histogram(
+    "scheduler_find_preemptible_node_duration_seconds",
+    "Time spent looking for a preemption victim",
+    buckets=DECISION_BUCKETS)
+EVICTION_DURATION = Histogram(
+    "scheduler_eviction_duration_seconds",
+    "Time to evict one preemption victim, including retries while a disruption budget blocks it",
+    ["result"],
+    buckets=LATENCY_BUCKETS)
+BIND_DURATION = Histogram(
+    "scheduler_bind_duration_seconds",
+    "Round-trip time of bind API calls",
+    ["result"],
+    buckets=LATENCY_BUCKETS)
+
+PREEMPTIONS = Counter(
+    "scheduler_preemptions_total",
+    "Pods evicted to make room for higher priority pods")
+BIND_FAILURES = Counter(
+    "scheduler_bind_failures_total",
+    "Binds that failed and were rolled back")
+WATCH_RECONNECTS = Counter(
+    "scheduler_watch_reconnects_total",
+    "Watch restarts (timeout: normal server-side expiry, expired: 410 relist, throttled: 429, "
+    "error: connection lost or a server error)",
+    ["resource", "reason"])
+SHARD_HANDOFFS = Counter(
+    "scheduler_shard_handoffs_total",
+    "Pods passed to another shard because it had a free node or a cheaper victim")
+
+QUEUE_DEPTH = Gauge(
+    "scheduler_pending_pods",
+    "Pods in the scheduling queue (active, backing off or unschedulable)")
+FREE_NODES = Gauge(
+    "scheduler_free_nodes",
+    "Schedulable nodes with room for another pod of ours (below the max pods per node)")
+ASSUMED_PODS = Gauge(
+    "scheduler_assumed_pods",
+    "Pods with a reserved node whose bind is not yet confirmed")
+
+IS_LEADER = Gauge(
+    "scheduler_is_leader",
+    "1 while this replica holds the leader lease (always 1 without leader election)")
+
+
+def start_metrics_server(scheduler, port: int, addr: str = "0.0.0.0"):
+    """Serve /metrics on port, with the gauges read from scheduler at scrape time"""
+    QUEUE_DEPTH.set_function(lambda: len(scheduler.scheduling_queue))
+    FREE_NODES.set_function(lambda: len(scheduler.free_nodes))
+    ASSUMED_PODS.set_function(lambda: len(scheduler.assumed_pods))
+    start_http_server(port, addr)
@@ -0,0 +1,28 @@
+"""
+AsyncCustomScheduler: every API call goes through the one client sized to its in-flight limit
+"""
+
+from kubernetes.config import kube_config
+
+from async_scheduler import AsyncCustomScheduler
+from fake_cluster import wait_for
+
+
+def test_caches_evictor_and_binder_share_the_client(cluster, monkeypatch):
+    monkeypatch.setattr(kube_config, "KUBE_CONFIG_DEFAULT_LOCATION", cluster.kubeconfig)
+    scheduler = AsyncCustomScheduler(max_in_flight=64, watch_mode="pending")
+
+    assert scheduler.v1.api_client.configuration.connection_pool_maxsize >= 64
+    for cache in [scheduler.node_cache, *scheduler.pod_caches]:
+        assert cache.v1 is scheduler.v1
+    assert scheduler.evictor.api is scheduler.v1
+    assert scheduler.binder.api_client is scheduler.v1.api_client
+
+
+def test_new_node_is_used(cluster):
+    cluster.start_scheduler("async_scheduler.py")
+
+    cluster.create("p0", 50)
+    assert cluster.stays_pending("p0")
+    cluster.server.add_node("node-0")
+    assert wait_for(lambda: cluster.node_of("p0") == "node-0")
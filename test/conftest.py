@@ -0,0 +1,11 @@
+import pytest
+
+from fake_cluster import Cluster
+
+
+@pytest.fixture
+def cluster():
+    """A fresh fake apiserver; the test starts the scheduler once the cluster is seeded"""
+    cluster = Cluster()
+    yield cluster
+    cluster.stop()
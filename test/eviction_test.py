@@ -0,0 +1,49 @@
+"""
+Evictions refused by a PodDisruptionBudget: the Evictor's retries, and the preemptor's retry
+once the scheduler offers the blocked victim again
+"""
+
+import logging
+
+from kubernetes import client, config
+
+from eviction import Evictor
+
+
+def make_evictor(cluster, retry_timeout):
+    api = client.CoreV1Api(config.new_client_from_config(config_file=cluster.kubeconfig))
+    evictor = Evictor(api, logging.getLogger("eviction_test"), retry_timeout=retry_timeout)
+    evictor.INITIAL_BACKOFF_SECONDS = 0.05
+    return evictor
+
+
+def test_blocked_eviction_is_retried_until_allowed(cluster):
+    cluster.server.add_node("node-0")
+    cluster.create("victim", 10, node_name="node-0")
+    cluster.server.block_evictions("default", "victim", 2)
+
+    assert make_evictor(cluster, retry_timeout=5).evict("victim", "default") == "evicted"
+    assert cluster.pod("victim") is None
+    assert cluster.server.evictions == 1
+
+
+def test_blocked_eviction_gives_up_after_retry_timeout(cluster):
+    cluster.server.add_node("node-0")
+    cluster.create("victim", 10, node_name="node-0")
+    cluster.server.block_evictions("default", "victim", 100)
+
+    assert make_evictor(cluster, retry_timeout=0.3).evict("victim", "default") == "blocked"
+    assert cluster.pod("victim") is not None
+    assert cluster.server.evictions == 0
+
+
+def test_preemptor_is_retried_once_the_victim_block_expires(cluster):
+    """Nothing happens in the cluster after the budget gives way, yet the preemptor gets its node"""
+    cluster.server.add_node("node-0")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.server.block_evictions("default", "low", 1)
+    cluster.start_scheduler(eviction_timeout_seconds=0.1, constants={"CustomScheduler.BLOCKED_VICTIM_SECONDS": 3})
+
+    assert cluster.bind("hi", 90) == "node-0"
+    assert cluster.pod("low") is None
+    assert cluster.server.evictions == 1
@@ -0,0 +1,121 @@
+"""
+Test harness: the custom scheduler running as a separate process against bench/fake_apiserver.py
+
+The `cluster` fixture in conftest.py hands each test a fresh Cluster; tests drive the fake
+apiserver directly and observe the scheduler through the pods, bindings and evictions it
+stores, so no cluster is needed.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "bench"))
+
+from fake_apiserver import FakeApiServer  # noqa: E402
+from scheduler_bench import pod_manifest  # noqa: E402,F401 (re-exported for the tests)
+
+TIMEOUT = 15
+
+# Runs a scheduler script's __main__ block after overriding class constants in custom_scheduler
+_BOOTSTRAP = """
+import importlib, sys, textwrap
+sys.path.insert(0, {repo!r})
+import custom_scheduler
+for attribute, value in {constants!r}.items():
+    class_name, name = attribute.split(".")
+    setattr(getattr(custom_scheduler, class_name), name, value)
+module = importlib.import_module({module!r})
+with open(module.__file__) as f:
+    main = textwrap.dedent(f.read().split('if __name__ == "__main__":', 1)[1])
+exec(main, vars(module))
+"""
+
+
+def wait_for(condition, timeout=TIMEOUT):
+    """Poll until condition() is true; False if it still isn't after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def holds(condition, seconds=1.0):
+    """Poll condition() for `seconds`; False as soon as it stops being true"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if not condition():
+            return False
+        time.sleep(0.02)
+    return condition()
+
+
+class Cluster:
+    """A fake apiserver plus a scheduler process watching it"""
+
+    def __init__(self, **server_options):
+        self.server = FakeApiServer(**server_options).start()
+        self.kubeconfig = self.server.write_kubeconfig(tempfile.mktemp(prefix="test-kubeconfig-"))
+        self.scheduler = None
+
+    def start_scheduler(self, script="custom_scheduler.py", constants=None, **options):
+        """Run the scheduler with SCHEDULER_* options (e.g. node_policy="lru") and wait for its watches
+
+        constants overrides class constants, e.g. {"CustomScheduler.BLOCKED_VICTIM_SECONDS": 1}.
+        """
+        env = dict(os.environ, KUBECONFIG=self.kubeconfig, SCHEDULER_METRICS_PORT="0")
+        env.update({f"SCHEDULER_{key.upper()}": str(value) for key, value in options.items()})
+        if constants:
+            bootstrap = _BOOTSTRAP.format(repo=REPO_DIR, constants=constants, module=script[:-len(".py")])
+            command = [sys.executable, "-c", bootstrap]
+        else:
+            command = [sys.executable, os.path.join(REPO_DIR, script)]
+        self.scheduler = subprocess.Popen(command, env=env,
+                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        watches = 2 if options.get("watch_mode") == "pending" else 1
+        assert wait_for(lambda: self.server.stats.get("WATCH pods", 0) >= watches and
+                        self.server.stats.get("WATCH nodes", 0) >= 1), "scheduler did not start watching"
+
+    def stop(self):
+        if self.scheduler is not None:
+            self.scheduler.send_signal(signal.SIGTERM)
+            try:
+                self.scheduler.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.scheduler.kill()
+        self.server.stop()
+        os.unlink(self.kubeconfig)
+
+    def pod(self, name):
+        with self.server.lock:
+            return self.server.pods.get(("default", name))
+
+    def node_of(self, name):
+        pod = self.pod(name)
+        return None if pod is None else pod["spec"].get("nodeName")
+
+    def placements(self):
+        """{pod name: node name or None} for every pod"""
+        with self.server.lock:
+            return {name: pod["spec"].get("nodeName") for (_, name), pod in self.server.pods.items()}
+
+    def create(self, name, priority, **kwargs):
+        """Create a pod of ours from pod_manifest() arguments"""
+        return self.server.create_pod(pod_manifest(name, priority, **kwargs))
+
+    def bind(self, name, priority, **kwargs):
+        """Create a pod and wait for it to be bound; returns its node"""
+        self.create(name, priority, **kwargs)
+        assert wait_for(lambda: self.node_of(name)), f"{name} was not bound"
+        return self.node_of(name)
+
+    def stays_pending(self, *names, seconds=1.0):
+        """Whether none of the pods gets bound within `seconds`"""
+        return holds(lambda: not any(self.node_of(name) for name in names), seconds)
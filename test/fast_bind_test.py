@@ -0,0 +1,53 @@
+"""
+FastBinder: pre-serialized binds against the fake apiserver, and the scheduler's fallback
+to the generated client
+"""
+
+import pytest
+from kubernetes import client, config
+from kubernetes.client.rest import ApiException
+
+from fast_bind import FastBinder
+
+
+def make_binder(cluster):
+    api_client = config.new_client_from_config(config_file=cluster.kubeconfig)
+    return FastBinder(api_client, pool_size=2, timeout=5)
+
+
+def test_bind_sets_the_node(cluster):
+    cluster.server.add_node("node-0")
+    cluster.create("p1", 10)
+
+    make_binder(cluster).bind("p1", "default", "node-0")
+    assert cluster.node_of("p1") == "node-0"
+
+
+def test_bind_error_raises_api_exception(cluster):
+    cluster.server.add_node("node-0")
+
+    with pytest.raises(ApiException) as e:
+        make_binder(cluster).bind("missing", "default", "node-0")
+    assert e.value.status == 404
+
+
+def test_headers_carry_the_bearer_token(cluster):
+    headers = make_binder(cluster)._request_headers()
+    assert headers["authorization"] == "Bearer fake"
+    assert headers["Content-Type"] == "application/json"
+
+
+def test_headers_without_credentials(cluster):
+    api_client = client.ApiClient(client.Configuration(host=cluster.server.url))
+    assert "authorization" not in FastBinder(api_client, pool_size=1, timeout=5)._request_headers()
+
+
+def test_scheduler_falls_back_to_the_client(cluster):
+    """An unexpected fast-path failure (a client version it doesn't handle) still binds the pod"""
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler(constants={"FastBinder._target": None})  # every fast bind raises TypeError
+
+    assert cluster.bind("p1", 10)
+    assert cluster.bind("p2", 10)
+    assert set(cluster.placements().values()) == {"node-0", "node-1"}
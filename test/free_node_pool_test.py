@@ -0,0 +1,71 @@
+"""
+FreeNodePool: the free-node set and its placement policies
+"""
+
+import pytest
+
+from custom_scheduler import FreeNodePool
+
+NODES = ["node-0", "node-1", "node-2", "node-3"]
+
+
+def take(pool, node):
+    """Pick a node and fill it, as binding its pod does"""
+    assert pool.pick() == node
+    pool.discard(node)
+
+
+def test_first_picks_the_earliest_free_node():
+    pool = FreeNodePool(NODES, "first")
+    take(pool, "node-0")
+    take(pool, "node-1")
+    pool.add("node-0")
+    assert pool.pick() == "node-0"
+    assert len(pool) == 3 and "node-1" not in pool
+
+
+def test_round_robin_continues_after_the_last_pick():
+    pool = FreeNodePool(NODES, "round-robin")
+    take(pool, "node-0")
+    take(pool, "node-1")
+    pool.add("node-0")
+    take(pool, "node-2")
+    take(pool, "node-3")
+    assert pool.pick() == "node-0"  # wraps around
+
+
+def test_random_picks_only_free_nodes():
+    pool = FreeNodePool(NODES, "random")
+    pool.discard("node-1")
+    pool.discard("node-3")
+    assert {pool.pick() for _ in range(50)} == {"node-0", "node-2"}
+
+
+def test_lru_prefers_the_node_freed_earliest():
+    """A node that frees up joins the back of the LRU order, where round-robin would take the next one along"""
+    pool = FreeNodePool(NODES[:3], "lru")
+    for node in NODES[:3]:
+        take(pool, node)
+    pool.add("node-1")
+    pool.add("node-0")
+    take(pool, "node-1")
+    take(pool, "node-0")
+
+
+def test_lru_moves_a_picked_node_to_the_back():
+    """With room for several pods, a node that was just picked waits for the others"""
+    pool = FreeNodePool(NODES[:3], "lru")
+    assert [pool.pick() for _ in range(4)] == ["node-0", "node-1", "node-2", "node-0"]
+
+
+@pytest.mark.parametrize("policy", FreeNodePool.POLICIES)
+def test_pick_falls_back_to_a_node_that_fits(policy):
+    pool = FreeNodePool(NODES, policy)
+    assert pool.pick(lambda node: node == "node-2") == "node-2"
+    assert pool.pick(lambda node: False) is None
+    assert FreeNodePool([], policy).pick() is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        FreeNodePool(NODES, "busiest")
@@ -0,0 +1,59 @@
+"""
+Gang scheduling: pod groups are placed all or nothing
+"""
+
+from fake_cluster import wait_for
+
+
+def test_gang_is_placed_all_or_nothing(cluster):
+    """A pod group that doesn't fit holds no node; it is placed whole once room appears"""
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler()
+
+    members = [f"job-{member}" for member in range(3)]
+    for name in members:
+        cluster.create(name, 50, group="job", min_member=3)
+    # Two members would fit, but the group needs three: the planned placements are rolled back
+    assert cluster.stays_pending(*members)
+    # ... leaving both nodes to other pods
+    assert cluster.bind("single", 10) in ("node-0", "node-1")
+    cluster.server.delete_pod("default", "single")
+
+    for i in range(2, 4):
+        cluster.server.add_node(f"node-{i}")
+    assert wait_for(lambda: all(cluster.node_of(name) for name in members))
+    assert len({cluster.node_of(name) for name in members}) == 3
+
+
+def test_gang_waits_for_min_member(cluster):
+    """Members hold no node until enough of the group is pending"""
+    for i in range(3):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler()
+
+    cluster.create("job-0", 50, group="job", min_member=2)
+    assert cluster.stays_pending("job-0")
+    cluster.create("job-1", 50, group="job", min_member=2)
+    assert wait_for(lambda: cluster.node_of("job-0") and cluster.node_of("job-1"))
+    # Members beyond min_member are placed as room appears
+    assert cluster.bind("job-2", 50, group="job", min_member=2)
+
+
+def test_gang_preempts_as_a_whole(cluster):
+    """The group's plan includes preemption victims, and the victims go only if the whole group fits"""
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.create("low-0", 10, node_name="node-0")
+    cluster.create("low-1", 10, node_name="node-1")
+    cluster.start_scheduler()
+
+    members = [f"job-{member}" for member in range(3)]
+    for name in members:
+        cluster.create(name, 50, group="job", min_member=3)
+    assert cluster.stays_pending(*members)
+    assert cluster.server.evictions == 0
+
+    cluster.server.add_node("node-2")
+    assert wait_for(lambda: all(cluster.node_of(name) for name in members))
+    assert cluster.server.evictions == 2
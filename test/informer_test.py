@@ -0,0 +1,43 @@
+"""
+Informer watches: reconnecting from the last resourceVersion through throttling, server
+errors and expired resourceVersions
+"""
+
+import pytest
+
+from fake_cluster import Cluster, wait_for
+
+FAST_RECONNECTS = {"PodCache.WATCH_TIMEOUT_SECONDS": 1, "Informer.RECONNECT_DELAY_SECONDS": 0.2}
+
+
+@pytest.mark.parametrize("code", [429, 503])
+def test_failing_watch_is_retried(cluster, code):
+    cluster.server.add_node("node-0")
+    cluster.start_scheduler(constants=FAST_RECONNECTS)
+
+    watches = cluster.server.stats["WATCH pods"]
+    cluster.server.fail_requests("WATCH pods", code, times=3)
+    assert wait_for(lambda: cluster.server.stats["WATCH pods"] >= watches + 4)
+    assert cluster.scheduler.poll() is None
+    assert cluster.bind("p1", 50) == "node-0"
+
+
+def test_failed_relist_is_retried():
+    """Pods created while the watch is down fall out of the server's history; the relist
+    that replaces them fails twice before it gets through"""
+    cluster = Cluster(history=2)
+    try:
+        for i in range(6):
+            cluster.server.add_node(f"node-{i}")
+        cluster.start_scheduler(constants={**FAST_RECONNECTS, "Informer.RECONNECT_DELAY_SECONDS": 1})
+
+        cluster.server.fail_requests("LIST pods", 503, times=2)
+        cluster.server.fail_requests("WATCH pods", 503)
+        assert wait_for(lambda: cluster.server.request_failures["WATCH pods"][1] == 0)
+        for i in range(6):
+            cluster.create(f"p{i}", 50)
+        assert wait_for(lambda: all(cluster.placements().values()))
+        assert cluster.server.request_failures["LIST pods"][1] == 0
+        assert cluster.scheduler.poll() is None
+    finally:
+        cluster.stop()
@@ -0,0 +1,47 @@
+"""
+LeaderElector against the fake apiserver's leases
+"""
+
+import logging
+import time
+
+from kubernetes import client, config
+
+from fake_cluster import wait_for
+from leader_election import LeaderElector
+
+
+def make_elector(cluster, identity, **timing):
+    api = client.CoordinationV1Api(config.new_client_from_config(config_file=cluster.kubeconfig))
+    changes = []
+    elector = LeaderElector(api, "custom-scheduler", "default", identity, logging.getLogger("leader_election_test"),
+                            on_change=lambda leading: changes.append((time.monotonic(), leading)), **timing)
+    return elector, changes
+
+
+def test_one_replica_leads(cluster):
+    first, _ = make_elector(cluster, "first", retry_period=0.1)
+    second, _ = make_elector(cluster, "second", retry_period=0.1)
+    first.start()
+    assert wait_for(lambda: first.is_leader)
+    second.start()
+    time.sleep(0.5)
+    assert not second.is_leader
+
+    first.stop()  # releases the lease
+    assert wait_for(lambda: second.is_leader, timeout=3)
+    second.stop()
+
+
+def test_leader_steps_down_when_renewals_hang(cluster):
+    """A renew stuck on a slow apiserver times out, so the leader steps down by its renew deadline"""
+    elector, changes = make_elector(cluster, "leader", lease_duration=3, renew_deadline=2, retry_period=0.2)
+    elector.start()
+    assert wait_for(lambda: elector.is_leader)
+
+    cluster.server.latency = 5  # every lease update now hangs past the lease duration
+    slowed = time.monotonic()
+    assert wait_for(lambda: not elector.is_leader, timeout=3)
+    assert changes[-1][0] - slowed < elector.renew_deadline + 0.5
+    cluster.server.latency = 0
+    elector.stop()
@@ -0,0 +1,32 @@
+"""
+Per-node pod index: which pods hold a node, and which of them preemption may evict
+"""
+
+
+def test_terminating_pod_keeps_its_node_until_deleted(cluster):
+    """A pod evicted by someone else still occupies its node while it terminates"""
+    cluster.server.termination = 1
+    cluster.server.add_node("node-0")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.start_scheduler()
+
+    assert cluster.server.evict_pod("default", "low")[0] == 201
+    assert cluster.pod("low")["metadata"].get("deletionTimestamp")
+    assert cluster.bind("p1", 50) == "node-0"
+    assert cluster.server.overlapping_binds == 0
+    assert cluster.server.deleted_at[("default", "low")] <= cluster.server.bound_at[("default", "p1")]
+
+
+def test_terminating_pod_is_not_a_victim(cluster):
+    """Preemption passes over a pod that is already going away and evicts a running one instead"""
+    cluster.server.termination = 1
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.create("mid", 20, node_name="node-1")
+    cluster.start_scheduler()
+
+    cluster.server.evict_pod("default", "low")
+    assert cluster.bind("hi", 90) == "node-1"
+    assert cluster.server.evictions == 2  # low by the test, mid by the scheduler
+    assert cluster.server.overlapping_binds == 0
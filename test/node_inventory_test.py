@@ -0,0 +1,56 @@
+"""
+Live node inventory: nodes are used or left alone as the node watch reports them
+"""
+
+import pytest
+
+from fake_cluster import wait_for
+
+UNSCHEDULABLE = {
+    "cordoned": {"unschedulable": True},
+    "not ready": {"ready": False},
+    "tainted": {"taints": [{"key": "maintenance", "effect": "NoSchedule"}]},
+}
+
+
+def test_new_node_is_used(cluster):
+    cluster.start_scheduler()
+
+    cluster.create("p0", 50)
+    assert cluster.stays_pending("p0")
+    cluster.server.add_node("node-0")
+    assert wait_for(lambda: cluster.node_of("p0") == "node-0")
+
+
+@pytest.mark.parametrize("condition", UNSCHEDULABLE)
+def test_node_is_used_once_schedulable(cluster, condition):
+    cluster.server.add_node("node-0", **UNSCHEDULABLE[condition])
+    cluster.start_scheduler()
+
+    cluster.create("p0", 50)
+    assert cluster.stays_pending("p0")
+    cluster.server.add_node("node-0")
+    assert wait_for(lambda: cluster.node_of("p0") == "node-0")
+
+
+@pytest.mark.parametrize("condition", UNSCHEDULABLE)
+def test_node_stops_receiving_pods(cluster, condition):
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler()
+
+    cluster.server.add_node("node-1", **UNSCHEDULABLE[condition])
+    assert cluster.bind("p0", 50) == "node-0"
+    cluster.create("p1", 50)
+    assert cluster.stays_pending("p1")
+
+
+def test_deleted_node_stops_receiving_pods(cluster):
+    for i in range(2):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler()
+
+    cluster.server.delete_node("node-1")
+    assert cluster.bind("p0", 50) == "node-0"
+    cluster.create("p1", 50)
+    assert cluster.stays_pending("p1")
@@ -0,0 +1,87 @@
+"""
+NodeResources: allocatable minus requested per node, and node selector labels
+"""
+
+from kubernetes import client
+
+from custom_scheduler import NodeResources
+
+
+def make_pod(requests=None, init_requests=None, overhead=None):
+    def container(name, requests):
+        return client.V1Container(name=name, resources=client.V1ResourceRequirements(requests=requests))
+    return client.V1Pod(spec=client.V1PodSpec(
+        containers=[container("c", requests)],
+        init_containers=[container("init", init_requests)] if init_requests else None,
+        overhead=overhead))
+
+
+def make_resources():
+    resources = NodeResources()
+    resources.set_allocatable("node-0", {"cpu": "4", "memory": "8Gi", "pods": "3", "example.com/gpu": "1"})
+    resources.set_labels("node-0", {"zone": "a", "disk": "ssd"})
+    return resources
+
+
+def test_requests_of_counts_containers_init_containers_and_overhead():
+    resources = NodeResources()
+    requests = dict(resources.requests_of(make_pod({"cpu": "500m", "memory": "1Gi"}, {"cpu": "2"}, {"cpu": "100m"})))
+    assert requests == {resources.columns["cpu"]: 2100, resources.columns["memory"]: 2 ** 30,
+                        resources.columns["pods"]: 1}
+
+
+def test_fits_within_unrequested_allocatable():
+    resources = make_resources()
+    pod = resources.requests_of(make_pod({"cpu": "3"}))
+    assert resources.fits("node-0", pod)
+    resources.add_pod("a", "node-0", resources.requests_of(make_pod({"cpu": "2"})))
+    assert not resources.fits("node-0", pod)
+    assert resources.fits("node-0", pod, without=["a"])
+    resources.remove_pod("a")
+    assert resources.fits("node-0", pod)
+
+
+def test_pods_and_extended_resources_count():
+    resources = make_resources()
+    gpu = resources.requests_of(make_pod({"example.com/gpu": "1"}))
+    assert resources.fits("node-0", gpu)
+    resources.add_pod("a", "node-0", gpu)
+    assert not resources.fits("node-0", gpu)
+
+    small = resources.requests_of(make_pod({"cpu": "100m"}))
+    resources.add_pod("b", "node-0", small)
+    resources.add_pod("c", "node-0", small)
+    assert not resources.fits("node-0", small)  # pods: 3
+
+
+def test_accounting_is_idempotent_and_follows_moves():
+    resources = make_resources()
+    resources.set_allocatable("node-1", {"cpu": "4", "pods": "10"})
+    pod = resources.requests_of(make_pod({"cpu": "3"}))
+    resources.add_pod("a", "node-0", pod)
+    resources.add_pod("a", "node-0", pod)
+    assert resources.fits("node-0", resources.requests_of(make_pod({"cpu": "1"})))
+    resources.add_pod("a", "node-1", pod)
+    assert resources.node_of("a") == "node-1"
+    assert resources.fits("node-0", resources.requests_of(make_pod({"cpu": "4"})))
+    resources.remove_pod("a")
+    resources.remove_pod("a")
+    assert resources.fits("node-1", resources.requests_of(make_pod({"cpu": "4"})))
+
+
+def test_selector_must_match_the_node_labels():
+    resources = make_resources()
+    resources.set_labels("node-1", {"zone": "b"})
+    resources.set_allocatable("node-1", {"cpu": "4", "pods": "10"})
+    ssd = resources.selector_bits({"disk": "ssd"})
+    assert resources.fits("node-0", (), ssd)
+    assert not resources.fits("node-1", (), ssd)
+    assert resources.fits("node-1", (), resources.selector_bits({}))
+    assert resources.selector_bits({"zone": "c"}) is None  # no node has it
+
+    resources.set_labels("node-0", {"zone": "a"})
+    assert not resources.fits("node-0", (), ssd)
+
+
+def test_unknown_node_fits_nothing():
+    assert not make_resources().fits("node-9", ())
@@ -0,0 +1,53 @@
+"""
+Nominated node: a preemptor's node stays reserved for it while its victims terminate
+"""
+
+from fake_cluster import wait_for
+
+
+def nominated_node(cluster, name):
+    pod = cluster.pod(name)
+    return pod and pod["status"].get("nominatedNodeName")
+
+
+def test_preemptor_is_nominated_and_bound_once_the_victim_is_gone(cluster):
+    cluster.server.termination = 1
+    cluster.server.add_node("node-0")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.start_scheduler()
+
+    cluster.create("hi", 90)
+    assert wait_for(lambda: nominated_node(cluster, "hi") == "node-0")
+    assert cluster.node_of("hi") is None and cluster.pod("low") is not None
+    assert wait_for(lambda: cluster.node_of("hi") == "node-0")
+    assert cluster.server.deleted_at[("default", "low")] <= cluster.server.bound_at[("default", "hi")]
+    assert cluster.server.overlapping_binds == 0
+
+
+def test_reserved_node_is_not_taken_by_a_later_pod(cluster):
+    """A pod arriving while the victim terminates finds the node reserved, not free"""
+    cluster.server.termination = 1
+    cluster.server.add_node("node-0")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.start_scheduler()
+
+    cluster.create("hi", 90)
+    assert wait_for(lambda: nominated_node(cluster, "hi") == "node-0")
+    cluster.create("mid", 50)
+    assert wait_for(lambda: cluster.node_of("hi") == "node-0")
+    assert cluster.stays_pending("mid")
+    assert cluster.server.evictions == 1
+
+
+def test_nomination_is_cleared_when_a_victim_stays(cluster):
+    """A disruption budget keeps the victim; the reservation is released and the pod retried"""
+    cluster.server.add_node("node-0")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.server.block_evictions("default", "low", 1000)
+    cluster.start_scheduler(eviction_timeout_seconds=1)
+
+    cluster.create("hi", 90)
+    assert wait_for(lambda: nominated_node(cluster, "hi") == "node-0")
+    assert wait_for(lambda: nominated_node(cluster, "hi") is None)
+    assert cluster.stays_pending("hi")
+    assert cluster.node_of("low") == "node-0"
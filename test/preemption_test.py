@@ -0,0 +1,50 @@
+"""
+Preemption victim choice: the set with the smallest total priority, then the fewest evictions,
+among those that need every victim
+"""
+
+
+def test_preemption_evicts_cheapest_victims(cluster):
+    """The victim set with the lowest total priority wins, and no victim more than needed is evicted"""
+    for node in ("a", "b"):
+        cluster.server.add_node(node)  # 4 cpu each
+    cluster.create("a-small", 10, node_name="a", requests={"cpu": "1"})
+    cluster.create("a-big", 20, node_name="a", requests={"cpu": "3"})
+    cluster.create("b-1", 15, node_name="b", requests={"cpu": "2"})
+    cluster.create("b-2", 16, node_name="b", requests={"cpu": "2"})
+    cluster.start_scheduler(max_pods_per_node=10)
+
+    # a-big alone (cost 20) beats b-1 and b-2 (31); a-small freed too little and is kept
+    assert cluster.bind("p1", 50, requests={"cpu": "3"}) == "a"
+    assert cluster.server.deletions == 1
+    assert cluster.node_of("a-big") is None and cluster.node_of("a-small") == "a"
+
+    # Only b can make room for 4 cpu without evicting p1, and both of its pods have to go
+    assert cluster.bind("p2", 50, requests={"cpu": "4"}) == "b"
+    assert cluster.server.deletions == 3
+    assert cluster.node_of("a-small") == "a" and cluster.node_of("p1") == "a"
+
+
+def test_one_pod_beats_a_cheaper_start(cluster):
+    """Evicting lowest priority first would take a and b (cost 3); c alone costs 2"""
+    cluster.server.add_node("node-0")  # 4 cpu
+    cluster.create("a", 1, node_name="node-0", requests={"cpu": "1"})
+    cluster.create("b", 2, node_name="node-0", requests={"cpu": "1"})
+    cluster.create("c", 2, node_name="node-0", requests={"cpu": "2"})
+    cluster.start_scheduler(max_pods_per_node=10)
+
+    assert cluster.bind("p", 50, requests={"cpu": "2"}) == "node-0"
+    assert cluster.server.deletions == 1
+    assert cluster.node_of("c") is None and cluster.node_of("a") == cluster.node_of("b") == "node-0"
+
+
+def test_negative_priority_pod_is_not_evicted_needlessly(cluster):
+    """Adding neg to the set would lower its total, but big alone makes room"""
+    cluster.server.add_node("node-0")  # 4 cpu
+    cluster.create("neg", -5, node_name="node-0", requests={"cpu": "1"})
+    cluster.create("big", 3, node_name="node-0", requests={"cpu": "3"})
+    cluster.start_scheduler(max_pods_per_node=10)
+
+    assert cluster.bind("p", 50, requests={"cpu": "3"}) == "node-0"
+    assert cluster.server.deletions == 1
+    assert cluster.node_of("neg") == "node-0"
@@ -0,0 +1,47 @@
+"""
+Resource-aware placement: requests against allocatable, and SCHEDULER_MAX_PODS_PER_NODE
+"""
+
+import pytest
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("first", ["node-0", "node-0", "node-1", "node-1", "node-2", "node-2"]),
+    ("round-robin", ["node-0", "node-1", "node-2", "node-0", "node-1", "node-2"]),
+    ("lru", ["node-0", "node-1", "node-2", "node-0", "node-1", "node-2"]),
+])
+def test_node_policy_pick_order(cluster, policy, expected):
+    """With room for two pods per node, each policy spreads (or packs) pods in its own order"""
+    for i in range(3):
+        cluster.server.add_node(f"node-{i}")
+    cluster.start_scheduler(node_policy=policy, max_pods_per_node=2)
+
+    assert [cluster.bind(f"pod-{i}", 50) for i in range(6)] == expected
+    cluster.create("extra", 50)
+    assert cluster.stays_pending("extra")
+
+
+def test_pod_goes_where_its_requests_fit(cluster):
+    cluster.server.add_node("small", allocatable={"cpu": "1", "memory": "2Gi", "pods": "110"})
+    cluster.server.add_node("large", allocatable={"cpu": "8", "memory": "32Gi", "pods": "110"})
+    cluster.start_scheduler(max_pods_per_node=10)
+
+    assert cluster.bind("big", 50, requests={"cpu": "6"}) == "large"
+    assert cluster.bind("tiny", 50, requests={"cpu": "500m"}) == "small"
+    cluster.create("too-big", 50, requests={"cpu": "3"})
+    assert cluster.stays_pending("too-big")
+
+
+def test_other_schedulers_pods_count(cluster):
+    """A pod we don't schedule still takes its requests out of the node"""
+    cluster.server.add_node("node-0")  # 4 cpu
+    other = cluster.server.create_pod({"metadata": {"name": "other"},
+                                       "spec": {"nodeName": "node-0", "containers": [
+                                           {"name": "c", "resources": {"requests": {"cpu": "3"}}}]}})
+    assert other is not None
+    cluster.start_scheduler(max_pods_per_node=10)
+
+    cluster.create("p0", 50, requests={"cpu": "2"})
+    assert cluster.stays_pending("p0")
+    cluster.server.delete_pod("default", "other")
+    assert cluster.bind("p1", 50, requests={"cpu": "1"}) == "node-0"
@@ -0,0 +1,116 @@
+"""
+SchedulingQueue: priority order, backoff and the unschedulable pool
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from kubernetes import client
+
+from custom_scheduler import SchedulingQueue
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_pod(name, priority, created=0):
+    return client.V1Pod(metadata=client.V1ObjectMeta(
+        name=name, namespace="default", uid=f"uid-{name}", annotations={"scheduler.priority": str(priority)},
+        creation_timestamp=EPOCH + timedelta(seconds=created)))
+
+
+def make_queue():
+    return SchedulingQueue(lambda pod: int(pod.metadata.annotations["scheduler.priority"]))
+
+
+def drain(queue):
+    names = []
+    while (pod := queue.pop()) is not None:
+        names.append(pod.metadata.name)
+    return names
+
+
+def test_highest_priority_then_oldest_first():
+    queue = make_queue()
+    queue.add(make_pod("low", 10, created=0))
+    queue.add(make_pod("high-new", 90, created=2))
+    queue.add(make_pod("high-old", 90, created=1))
+    queue.add(make_pod("high-old", 90, created=1))  # a repeated event doesn't queue it twice
+    assert len(queue) == 3
+    assert drain(queue) == ["high-old", "high-new", "low"]
+    assert len(queue) == 0
+
+
+def test_backoff_delays_the_next_attempt():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 0.2
+    queue.add_backoff(make_pod("p", 10))
+    assert queue.pop() is None
+    assert 0 < queue.wait_time() <= 0.2
+    time.sleep(0.2)
+    assert queue.wait_time() == 0
+    assert queue.pop().metadata.name == "p"
+
+
+def test_backoff_doubles_up_to_the_maximum():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 1
+    queue.MAX_BACKOFF_SECONDS = 3
+    pod = make_pod("p", 10)
+    delays = []
+    for _ in range(4):
+        queue.add_backoff(pod)
+        delays.append(round(queue._ready_at["uid-p"] - time.monotonic()))
+    assert delays == [1, 2, 3, 3]
+    assert queue.attempts("uid-p") == 4
+    queue.remove("uid-p")
+    assert queue.attempts("uid-p") == 0 and "uid-p" not in queue
+
+
+def test_unschedulable_pods_wait_for_a_cluster_change():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 0
+    queue.add_unschedulable(make_pod("parked", 10))
+    assert queue.pop() is None and "uid-parked" in queue
+    queue.move_all_to_active()
+    assert queue.pop().metadata.name == "parked"
+
+
+def test_cluster_change_respects_backoff_unless_it_adds_capacity():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 10
+    queue.add_unschedulable(make_pod("a", 10))
+    queue.move_all_to_active()
+    assert queue.pop() is None  # back in backoff, not parked
+
+    queue.add_unschedulable(make_pod("b", 10))
+    queue.move_all_to_active(ignore_backoff=True)  # e.g. a new node
+    assert drain(queue) == ["b"]
+
+
+def test_removed_pod_is_not_popped():
+    queue = make_queue()
+    queue.add(make_pod("gone", 10))
+    queue.add(make_pod("kept", 5))
+    queue.remove("uid-gone")
+    assert drain(queue) == ["kept"]
+
+
+def test_long_parked_pods_are_flushed_to_active():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 0
+    queue.UNSCHEDULABLE_TIMEOUT_SECONDS = 0
+    queue.add_unschedulable(make_pod("parked", 10))
+    assert queue.pop() is None
+
+    queue.flush_unschedulable()
+    assert queue.pop().metadata.name == "parked"
+
+
+def test_flush_leaves_recently_parked_pods():
+    queue = make_queue()
+    queue.INITIAL_BACKOFF_SECONDS = 0
+    queue.add_unschedulable(make_pod("parked", 10))
+
+    queue.flush_unschedulable()
+    assert queue.pop() is None
+    assert "uid-parked" in queue
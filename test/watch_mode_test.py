@@ -0,0 +1,38 @@
+"""
+SCHEDULER_WATCH_MODE: what the pod watch receives must not change what gets scheduled
+"""
+
+import pytest
+
+from fake_cluster import wait_for
+
+
+@pytest.mark.parametrize("watch_mode", ["all", "scheduler", "pending"])
+def test_watch_modes_agree(cluster, watch_mode):
+    """Filtered watches (server-side, or pending pods plus bound ones separately) schedule exactly like watching all pods"""
+    for i in range(3):
+        cluster.server.add_node(f"node-{i}")
+    cluster.create("low", 10, node_name="node-0")
+    cluster.start_scheduler(watch_mode=watch_mode)
+
+    assert cluster.bind("p0", 50) == "node-1"
+    assert cluster.bind("p1", 50) == "node-2"
+    assert cluster.bind("p2", 90) == "node-0"  # preempts low
+    assert cluster.node_of("low") is None
+    cluster.create("p3", 5)
+    assert cluster.stays_pending("p3")  # nothing cheaper than itself to evict
+    cluster.server.delete_pod("default", "p1")
+    assert wait_for(lambda: cluster.node_of("p3"))
+    assert cluster.placements() == {"p0": "node-1", "p2": "node-0", "p3": "node-2"}
+
+
+def test_pending_mode_sees_bound_pods_go(cluster):
+    """In pending mode a bound pod has left the pending watch; its deletion still frees the node"""
+    cluster.server.add_node("node-0")
+    cluster.start_scheduler(watch_mode="pending")
+
+    assert cluster.bind("p0", 50) == "node-0"
+    cluster.create("p1", 50)
+    assert cluster.stays_pending("p1")
+    cluster.server.delete_pod("default", "p0")
+    assert wait_for(lambda: cluster.node_of("p1") == "node-0")